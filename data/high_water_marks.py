@@ -0,0 +1,237 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, Set
+
+from data.resume import Resume
+from data.resume_cache import ResumeCache
+
+
+class HighWaterMarks:
+    """
+    Persistent SQLite record of the resumes each search has found, so repeat
+    crawls of a search can stop where the previous crawl left off.
+
+    Result pages list the newest resumes first, so once a page holds only resumes
+    the search has found before, the pages after it hold nothing new, provided the
+    crawl that found them was not cut short. Searches whose last crawl ran to its
+    end are marked complete. The resumes of every search are kept newest first, up
+    to `max_per_query` of them.
+    """
+
+    DEFAULT_PATH = "high_water_marks.sqlite3"
+    DEFAULT_MAX_PER_QUERY = 1000
+
+    def __init__(
+        self, path: str = DEFAULT_PATH, max_per_query: int = DEFAULT_MAX_PER_QUERY
+    ):
+        self.max_per_query = max_per_query
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS seen_resumes ("
+                " site TEXT NOT NULL,"
+                " query TEXT NOT NULL,"
+                " resume_id TEXT NOT NULL,"
+                " seen_at REAL NOT NULL,"
+                " PRIMARY KEY (site, query, resume_id))"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS seen_resumes_seen_at"
+                " ON seen_resumes (site, query, seen_at)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS completed_crawls ("
+                " site TEXT NOT NULL,"
+                " query TEXT NOT NULL,"
+                " PRIMARY KEY (site, query))"
+            )
+
+    def known(self, site: str, query: str, resume_ids: Iterable[str]) -> Set[str]:
+        """
+        Returns the resume IDs that an earlier crawl of the search has found.
+        """
+        resume_ids = list(resume_ids)
+        if not resume_ids:
+            return set()
+
+        placeholders = ", ".join("?" * len(resume_ids))
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT resume_id FROM seen_resumes WHERE site = ? AND query = ?"
+                f" AND resume_id IN ({placeholders})",
+                (site, query, *resume_ids),
+            ).fetchall()
+        return {resume_id for (resume_id,) in rows}
+
+    def add(
+        self,
+        site: str,
+        query: str,
+        resume_ids: Iterable[str],
+        seen_at: float = None,
+        position: int = 0,
+    ) -> None:
+        """
+        Records resumes found by a crawl of the search, as its newest.
+
+        Args:
+            site (str): The site of the search.
+            query (str): The key of the search, as built by the parser's `query_key`.
+            resume_ids (Iterable[str]): The resumes found, in the order of the results.
+            seen_at (float, optional): When the crawl started. Defaults to now.
+            position (int, optional): The position of the first resume among all
+                results of the crawl, for crawls recorded page by page. Defaults to 0.
+        """
+        seen_at = time.time() if seen_at is None else seen_at
+        # Earlier results get later timestamps, so they read back first.
+        rows = [
+            (site, query, resume_id, seen_at - (position + i) * 1e-6)
+            for i, resume_id in enumerate(resume_ids)
+        ]
+        if not rows:
+            return
+
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT INTO seen_resumes (site, query, resume_id, seen_at)"
+                " VALUES (?, ?, ?, ?)"
+                " ON CONFLICT (site, query, resume_id)"
+                " DO UPDATE SET seen_at = excluded.seen_at",
+                rows,
+            )
+            self._connection.execute(
+                "DELETE FROM seen_resumes WHERE site = ? AND query = ? AND rowid NOT IN"
+                " (SELECT rowid FROM seen_resumes WHERE site = ? AND query = ?"
+                " ORDER BY seen_at DESC LIMIT ?)",
+                (site, query, site, query, self.max_per_query),
+            )
+
+    def completed(self, site: str, query: str) -> bool:
+        """
+        Checks whether the last crawl of the search that recorded resumes ran to
+        its end, so the resumes recorded have no gaps.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT 1 FROM completed_crawls WHERE site = ? AND query = ?",
+                (site, query),
+            ).fetchone()
+        return row is not None
+
+    def set_completed(self, site: str, query: str, completed: bool) -> None:
+        with self._lock, self._connection:
+            if completed:
+                self._connection.execute(
+                    "INSERT OR IGNORE INTO completed_crawls (site, query) VALUES (?, ?)",
+                    (site, query),
+                )
+            else:
+                self._connection.execute(
+                    "DELETE FROM completed_crawls WHERE site = ? AND query = ?",
+                    (site, query),
+                )
+
+    def resume_ids(self, site: str, query: str) -> List[str]:
+        """
+        Lists the resumes found by earlier crawls of the search, newest first.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT resume_id FROM seen_resumes WHERE site = ? AND query = ?"
+                " ORDER BY seen_at DESC",
+                (site, query),
+            ).fetchall()
+        return [resume_id for (resume_id,) in rows]
+
+
+class IncrementalCrawl:
+    """
+    Follows one crawl of a search against the high-water marks of its earlier
+    crawls: tells when a result page holds nothing new, records the resumes the
+    crawl resolves, and lists the earlier results it did not reach.
+
+    Earlier results are only trusted if the last crawl that recorded any ran to
+    its end. Once this crawl records a page, the search counts as incomplete
+    until `finish` is called, so a crawl cut short by a budget, the user or an
+    error makes the next one crawl past the pages it reached.
+    """
+
+    def __init__(self, site: str, query: str, marks: HighWaterMarks = None):
+        self.site = site
+        self.query = query
+        self.marks = marks or get_high_water_marks()
+        self._started = time.time()
+        self._crawled = set()
+        self._recorded = 0
+        self._trusted = self.marks.completed(site, query)
+
+    def caught_up(self, resume_ids: Iterable[str]) -> bool:
+        """
+        Checks whether earlier crawls found every resume of a result page, so the
+        pages after it need no crawling.
+        """
+        resume_ids = set(resume_ids)
+        return (
+            self._trusted
+            and bool(resume_ids)
+            and resume_ids <= self.marks.known(self.site, self.query, resume_ids)
+        )
+
+    def record(self, resume_ids: Iterable[str]) -> None:
+        """
+        Records the resumes of a result page that the crawl fetched or found
+        cached, in the order of the page.
+        """
+        resume_ids = list(resume_ids)
+        if not self._recorded:
+            self.marks.set_completed(self.site, self.query, False)
+        self.marks.add(self.site, self.query, resume_ids, self._started, self._recorded)
+        self._crawled.update(resume_ids)
+        self._recorded += len(resume_ids)
+
+    def finish(self) -> None:
+        """
+        Marks the search complete once the crawl has run to its end: the last
+        result page, the page limit, or a page earlier crawls were caught up on.
+        """
+        self.marks.set_completed(self.site, self.query, True)
+
+    def stored_resumes(self, cache: ResumeCache) -> List[Resume]:
+        """
+        Loads the resumes earlier crawls found that this one did not reach.
+        """
+        return cache.load_many(
+            self.site,
+            (
+                resume_id
+                for resume_id in self.marks.resume_ids(self.site, self.query)
+                if resume_id not in self._crawled
+            ),
+        )
+
+
+_high_water_marks = None
+_high_water_marks_lock = threading.Lock()
+
+
+def get_high_water_marks() -> HighWaterMarks:
+    """
+    Returns the shared high-water marks, configured from the HIGH_WATER_MARKS_PATH
+    and HIGH_WATER_MARKS_PER_QUERY environment variables.
+    """
+    global _high_water_marks
+    with _high_water_marks_lock:
+        if _high_water_marks is None:
+            _high_water_marks = HighWaterMarks(
+                os.environ.get("HIGH_WATER_MARKS_PATH", HighWaterMarks.DEFAULT_PATH),
+                int(
+                    os.environ.get(
+                        "HIGH_WATER_MARKS_PER_QUERY",
+                        HighWaterMarks.DEFAULT_MAX_PER_QUERY,
+                    )
+                ),
+            )
+        return _high_water_marks
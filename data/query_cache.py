@@ -0,0 +1,154 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Hashable, List, Tuple
+
+from data.resume import Resume
+
+
+class QueryResultCache:
+    """
+    In-process cache of the resumes found by recent searches, keyed by their
+    normalized criteria, which also coalesces identical searches in flight.
+
+    The first caller to `join` a query becomes its owner and runs the search;
+    later callers get the same future and wait for the owner's result instead
+    of crawling again. Results expire after `ttl` seconds, and once more than
+    `max_entries` queries are cached the least recently used ones are dropped.
+
+    Futures are `concurrent.futures.Future`s, so searches on different threads
+    or event loops share them too; wrap them with `asyncio.wrap_future` to await.
+    """
+
+    DEFAULT_TTL = 10 * 60
+    DEFAULT_MAX_ENTRIES = 128
+
+    def __init__(
+        self, ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._results = OrderedDict()
+        self._in_flight = {}
+        self._joined = set()
+
+    def join(self, key: Hashable) -> Tuple[Future, bool]:
+        """
+        Joins the search for a query.
+
+        Args:
+            key (Hashable): The normalized criteria of the query.
+
+        Returns:
+            Tuple[Future, bool]: A future of the resumes found, and whether the caller
+            owns the search. The owner must run it and report the outcome with
+            `finish` or `abandon`; the future is already done for cached queries.
+        """
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None:
+                expires_at, future = cached
+                if expires_at > time.monotonic():
+                    self._results.move_to_end(key)
+                    return future, False
+                del self._results[key]
+
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._joined.add(key)
+                return future, False
+
+            future = Future()
+            self._in_flight[key] = future
+            return future, True
+
+    def finish(
+        self, key: Hashable, future: Future, resumes: List[Resume], store: bool = True
+    ) -> None:
+        """
+        Hands the resumes found by the owner of a query to everyone waiting on it.
+
+        Args:
+            key (Hashable): The normalized criteria of the query.
+            future (Future): The future returned by `join`.
+            resumes (List[Resume]): All resumes found, unranked; they are shared,
+                so callers should rank copies of them.
+            store (bool, optional): Cache the resumes for later queries; pass False
+                for partial results, e.g. of a stopped search. Defaults to True.
+        """
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+                self._joined.discard(key)
+            if store:
+                self._store(key, future)
+        if not future.done():
+            future.set_result(tuple(resumes))
+
+    def joined(self, key: Hashable) -> bool:
+        """
+        Checks whether another search has joined the search in flight for a query.
+        """
+        with self._lock:
+            return key in self._joined
+
+    def put(self, key: Hashable, resumes: List[Resume]) -> bool:
+        """
+        Caches the resumes of a query searched without `join`, e.g. by a background
+        crawl, unless a search for the query is in flight.
+
+        Returns:
+            bool: True if the resumes were cached.
+        """
+        future = Future()
+        future.set_result(tuple(resumes))
+        with self._lock:
+            if key in self._in_flight:
+                return False
+            self._store(key, future)
+        return True
+
+    def abandon(self, key: Hashable, future: Future, error: BaseException) -> None:
+        """
+        Fails the waiters of a query whose owner could not complete the search.
+        """
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+                self._joined.discard(key)
+        if not isinstance(error, Exception):
+            error = RuntimeError("The search was cancelled")
+        if not future.done():
+            future.set_exception(error)
+
+    def _store(self, key, future):
+        self._results[key] = (time.monotonic() + self.ttl, future)
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+
+_query_cache = None
+_query_cache_lock = threading.Lock()
+
+
+def get_query_cache() -> QueryResultCache:
+    """
+    Returns the shared query result cache, configured from the QUERY_CACHE_TTL
+    and QUERY_CACHE_MAX_ENTRIES environment variables.
+    """
+    global _query_cache
+    with _query_cache_lock:
+        if _query_cache is None:
+            _query_cache = QueryResultCache(
+                float(os.environ.get("QUERY_CACHE_TTL", QueryResultCache.DEFAULT_TTL)),
+                int(
+                    os.environ.get(
+                        "QUERY_CACHE_MAX_ENTRIES", QueryResultCache.DEFAULT_MAX_ENTRIES
+                    )
+                ),
+            )
+        return _query_cache
@@ -1,54 +1,148 @@
-from dataclasses import dataclass
-from typing import List
+import sys
+from dataclasses import dataclass, field
+from typing import Optional, Tuple
+from utils.normalize import (
+    format_city,
+    format_experience,
+    format_salary,
+    normalize_skills,
+    parse_city,
+    parse_experience,
+    parse_position,
+    parse_salary_amount,
+    parse_skills,
+    to_uah,
+)
 
 
-@dataclass
+@dataclass(slots=True)
 class Resume:
-    position: str
-    experience: str
-    skills: List[str]
-    location: str
-    salary: str
+    """
+    A parsed resume. Attributes are normalized once, when the resume is extracted:
+    experience in months, skills as sorted, distinct and interned skill tokens,
+    the city as a canonical city ID and the expected salary in UAH. Unspecified
+    attributes are None (no skills for skills), and display strings are derived
+    on access. Salaries asked in another currency are converted only to be scored
+    and filtered; the amount and currency asked are kept for display.
+
+    Skills are kept in a tuple rather than a frozenset, which would take several
+    times the memory; `utils.scoring` intersects the set of keywords with them.
+
+    Resumes built from search result cards are partial: attributes the card does
+    not show are left unspecified until the resume page is parsed, and the text of
+    the card is kept as the description.
+    """
+
+    position: Optional[str]
+    experience_months: Optional[int] = None
+    skills: Tuple[str, ...] = ()
+    city_id: Optional[str] = None
+    salary_uah: Optional[int] = None
     link: str = ""
+    partial: bool = False
+    salary_amount: Optional[int] = None
+    salary_currency: Optional[str] = None
+    description: Optional[str] = field(default=None, compare=False, repr=False)
+    relevance_score: Optional[float] = field(default=None, compare=False, repr=False)
 
-    def score(self, keywords: List[str]):
+    @staticmethod
+    def parse(
+        position: Optional[str],
+        experience: Optional[str] = None,
+        skills: Optional[str] = None,
+        location: Optional[str] = None,
+        salary: Optional[str] = None,
+        link: str = "",
+        partial: bool = False,
+        description: Optional[str] = None,
+    ) -> "Resume":
         """
-        Calculate the relevance score of the resume based on various attributes.
-
-        Scoring Criteria:
-        - Job position: +2 points if specified.
-        - Experience: +2 points if specified.
-        - Skills: +2 points if specified.
-        - Location: +1 point if specified.
-        - Salary: +1 point if specified.
-        - Skills matching keywords: +5 points for each matching skill.
+        Builds a resume from the text extracted from a resume page or result card.
 
         Args:
-            keywords (List[str]): List of keywords to match in the skills section.
+            position (str, optional): The job position.
+            experience (str, optional): The work experience, e.g. "2 роки 3 місяці".
+            skills (str, optional): Comma-separated skills.
+            location (str, optional): The city.
+            salary (str, optional): The expected salary, e.g. "30 000 грн".
+            link (str, optional): The link to the resume.
+            partial (bool, optional): Whether the text comes from a result card.
+            description (str, optional): Free text about the resume, e.g. the text
+                of its result card.
 
         Returns:
-            int: Total relevance score for the resume.
+            Resume: The normalized resume.
         """
+        salary_amount, salary_currency = parse_salary_amount(salary)
+        return Resume(
+            parse_position(position),
+            parse_experience(experience),
+            parse_skills(skills),
+            parse_city(location),
+            to_uah(salary_amount, salary_currency),
+            link,
+            partial,
+            salary_amount,
+            salary_currency,
+            description,
+        )
 
-        score = 0
+    @property
+    def position_text(self) -> str:
+        return self.position or "Unknown"
 
-        if self.position != "Unknown":
-            score += 2
+    @property
+    def experience_text(self) -> str:
+        return format_experience(self.experience_months)
 
-        if self.experience != "Unknown":
-            score += 2
+    @property
+    def skills_text(self) -> str:
+        return ", ".join(self.skills) or "Unknown"
 
-        if self.skills != "Unknown":
-            score += 2
+    @property
+    def location_text(self) -> str:
+        return format_city(self.city_id)
 
-        if self.location != "Unknown":
-            score += 1
+    @property
+    def salary_text(self) -> str:
+        if self.salary_amount is None:
+            return format_salary(self.salary_uah)
+        return format_salary(self.salary_amount, self.salary_currency)
 
-        if self.salary != "Unknown":
-            score += 1
+    def to_dict(self) -> dict:
+        """
+        Serializes the resume to a JSON-compatible dict.
+        """
+        return {
+            "position": self.position,
+            "experience_months": self.experience_months,
+            "skills": list(self.skills),
+            "city_id": self.city_id,
+            "salary_uah": self.salary_uah,
+            "link": self.link,
+            "salary_amount": self.salary_amount,
+            "salary_currency": self.salary_currency,
+            "description": self.description,
+        }
 
-        skill_keywords = set(keywords)
-        matching_skills = skill_keywords.intersection(set(self.skills))
-        score += 5 * len(matching_skills)
+    @staticmethod
+    def from_dict(data: dict) -> "Resume":
+        """
+        Deserializes a resume written by `to_dict`, or by older versions that
+        stored display strings. Skills are normalized again, so cached resumes
+        follow changes to the skill synonyms.
+        """
+        if "experience" in data:
+            return Resume.parse(**data)
 
-        return score
+        return Resume(
+            data["position"],
+            data["experience_months"],
+            normalize_skills(data["skills"]),
+            data["city_id"] and sys.intern(data["city_id"]),
+            data["salary_uah"],
+            data["link"],
+            salary_amount=data.get("salary_amount"),
+            salary_currency=data.get("salary_currency"),
+            description=data.get("description"),
+        )
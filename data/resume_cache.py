@@ -0,0 +1,316 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from data.resume import Resume
+
+
+@dataclass
+class PageValidators:
+    """
+    Validators of the resume page a cached resume was parsed from.
+    """
+
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+
+    @staticmethod
+    def hash_content(content) -> str:
+        if isinstance(content, str):
+            content = content.encode()
+        return hashlib.sha1(content).hexdigest()
+
+
+@dataclass
+class CachedResume:
+    resume: Resume
+    fresh: bool
+    validators: PageValidators
+
+
+class ResumeCache:
+    """
+    Persistent SQLite cache of parsed resumes, keyed by site and resume ID.
+
+    Entries older than `ttl` seconds are treated as missing by `get`, and once the
+    cache holds more than `max_entries` resumes the least recently used ones are
+    evicted. Each entry also keeps the validators of its resume page, so expired
+    entries can be revalidated with `lookup` and `touch_many` instead of re-parsed.
+    """
+
+    DEFAULT_PATH = "resume_cache.sqlite3"
+    DEFAULT_TTL = 24 * 60 * 60
+    DEFAULT_MAX_ENTRIES = 50_000
+
+    def __init__(
+        self,
+        path: str = DEFAULT_PATH,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS resumes ("
+                " site TEXT NOT NULL,"
+                " resume_id TEXT NOT NULL,"
+                " data TEXT NOT NULL,"
+                " fetched_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL,"
+                " PRIMARY KEY (site, resume_id))"
+            )
+            columns = {
+                row[1] for row in self._connection.execute("PRAGMA table_info(resumes)")
+            }
+            for column in ("etag", "last_modified", "content_hash"):
+                if column not in columns:
+                    self._connection.execute(
+                        f"ALTER TABLE resumes ADD COLUMN {column} TEXT"
+                    )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS resumes_accessed_at"
+                " ON resumes (accessed_at)"
+            )
+        (self._size,) = self._connection.execute(
+            "SELECT COUNT(*) FROM resumes"
+        ).fetchone()
+
+    def get(self, site: str, resume_id: str) -> Optional[Resume]:
+        """
+        Returns the cached resume, or None if it is missing or expired.
+        """
+        cached = self.lookup(site, resume_id)
+        return cached.resume if cached and cached.fresh else None
+
+    def lookup(self, site: str, resume_id: str) -> Optional[CachedResume]:
+        """
+        Returns the cached resume along with its freshness and page validators,
+        or None if it is missing. Expired entries are returned too.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT data, fetched_at, etag, last_modified, content_hash"
+                " FROM resumes WHERE site = ? AND resume_id = ?",
+                (site, resume_id),
+            ).fetchone()
+            if row is None:
+                return None
+
+            with self._connection:
+                self._connection.execute(
+                    "UPDATE resumes SET accessed_at = ? WHERE site = ? AND resume_id = ?",
+                    (now, site, resume_id),
+                )
+
+        data, fetched_at, etag, last_modified, content_hash = row
+        return CachedResume(
+            Resume.from_dict(json.loads(data)),
+            now - fetched_at <= self.ttl,
+            PageValidators(etag, last_modified, content_hash),
+        )
+
+    def lookup_many(
+        self, site: str, resume_ids: Iterable[str]
+    ) -> List[Optional[CachedResume]]:
+        """
+        Looks up several resumes as `lookup` does, reading them and recording the
+        access in one transaction.
+
+        Returns:
+            List[Optional[CachedResume]]: The cached resumes in the order of
+            `resume_ids`, with None for missing ones.
+        """
+        resume_ids = list(resume_ids)
+        now = time.time()
+        rows = {}
+        with self._lock:
+            for start in range(0, len(resume_ids), 500):
+                chunk = resume_ids[start : start + 500]
+                for row in self._connection.execute(
+                    "SELECT resume_id, data, fetched_at, etag, last_modified,"
+                    " content_hash FROM resumes WHERE site = ?"
+                    f" AND resume_id IN ({', '.join('?' * len(chunk))})",
+                    (site, *chunk),
+                ):
+                    rows[row[0]] = row[1:]
+            if rows:
+                with self._connection:
+                    self._connection.executemany(
+                        "UPDATE resumes SET accessed_at = ?"
+                        " WHERE site = ? AND resume_id = ?",
+                        [(now, site, resume_id) for resume_id in rows],
+                    )
+
+        cached = []
+        for resume_id in resume_ids:
+            row = rows.get(resume_id)
+            if row is None:
+                cached.append(None)
+                continue
+            data, fetched_at, etag, last_modified, content_hash = row
+            cached.append(
+                CachedResume(
+                    Resume.from_dict(json.loads(data)),
+                    now - fetched_at <= self.ttl,
+                    PageValidators(etag, last_modified, content_hash),
+                )
+            )
+        return cached
+
+    def put(
+        self,
+        site: str,
+        resume_id: str,
+        resume: Resume,
+        validators: Optional[PageValidators] = None,
+    ) -> None:
+        """
+        Stores a freshly parsed resume.
+        """
+        self.put_many(site, [(resume_id, resume, validators)])
+
+    def put_many(
+        self,
+        site: str,
+        items: Iterable[Tuple[str, Resume, Optional[PageValidators]]],
+    ) -> None:
+        """
+        Stores several freshly parsed resumes in one transaction.
+
+        Args:
+            site (str): The site the resumes were fetched from.
+            items (Iterable[Tuple[str, Resume, Optional[PageValidators]]]): Resume ID,
+                resume and the validators of the page it was parsed from.
+        """
+        now = time.time()
+        with self._lock, self._connection:
+            for resume_id, resume, validators in items:
+                validators = validators or PageValidators()
+                exists = self._connection.execute(
+                    "SELECT 1 FROM resumes WHERE site = ? AND resume_id = ?",
+                    (site, resume_id),
+                ).fetchone()
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO resumes"
+                    " (site, resume_id, data, fetched_at, accessed_at,"
+                    " etag, last_modified, content_hash)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        site,
+                        resume_id,
+                        json.dumps(resume.to_dict()),
+                        now,
+                        now,
+                        validators.etag,
+                        validators.last_modified,
+                        validators.content_hash,
+                    ),
+                )
+                if not exists:
+                    self._size += 1
+
+            self._evict()
+
+    def touch_many(self, site: str, resume_ids: Iterable[str]) -> None:
+        """
+        Marks cached resumes as fresh again after their pages were revalidated.
+        """
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "UPDATE resumes SET fetched_at = ?, accessed_at = ?"
+                " WHERE site = ? AND resume_id = ?",
+                [(now, now, site, resume_id) for resume_id in resume_ids],
+            )
+
+    def load_many(self, site: str, resume_ids: Iterable[str]) -> List[Resume]:
+        """
+        Returns the cached resumes with the given IDs, in that order, expired ones
+        included; missing resumes are left out.
+        """
+        resume_ids = list(resume_ids)
+        now = time.time()
+        rows = {}
+        with self._lock:
+            # Chunked to stay under the SQLite limit of bound parameters.
+            for start in range(0, len(resume_ids), 500):
+                chunk = resume_ids[start : start + 500]
+                rows.update(
+                    self._connection.execute(
+                        "SELECT resume_id, data FROM resumes WHERE site = ?"
+                        f" AND resume_id IN ({', '.join('?' * len(chunk))})",
+                        (site, *chunk),
+                    ).fetchall()
+                )
+            if rows:
+                with self._connection:
+                    self._connection.executemany(
+                        "UPDATE resumes SET accessed_at = ?"
+                        " WHERE site = ? AND resume_id = ?",
+                        [(now, site, resume_id) for resume_id in rows],
+                    )
+
+        return [
+            Resume.from_dict(json.loads(rows[resume_id]))
+            for resume_id in resume_ids
+            if resume_id in rows
+        ]
+
+    def items(self) -> Iterator[Tuple[str, str, Resume]]:
+        """
+        Yields every cached resume with its site and resume ID, expired ones
+        included. Unlike `lookup`, this does not count as an access.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT site, resume_id, data FROM resumes"
+            ).fetchall()
+
+        for site, resume_id, data in rows:
+            yield site, resume_id, Resume.from_dict(json.loads(data))
+
+    def _evict(self) -> None:
+        overflow = self._size - self.max_entries
+        if overflow <= 0:
+            return
+
+        self._connection.execute(
+            "DELETE FROM resumes WHERE rowid IN"
+            " (SELECT rowid FROM resumes ORDER BY accessed_at LIMIT ?)",
+            (overflow,),
+        )
+        self._size -= overflow
+
+
+_resume_cache = None
+_resume_cache_lock = threading.Lock()
+
+
+def get_resume_cache() -> ResumeCache:
+    """
+    Returns the shared resume cache, configured from the RESUME_CACHE_PATH,
+    RESUME_CACHE_TTL and RESUME_CACHE_MAX_ENTRIES environment variables.
+    """
+    global _resume_cache
+    with _resume_cache_lock:
+        if _resume_cache is None:
+            _resume_cache = ResumeCache(
+                os.environ.get("RESUME_CACHE_PATH", ResumeCache.DEFAULT_PATH),
+                float(os.environ.get("RESUME_CACHE_TTL", ResumeCache.DEFAULT_TTL)),
+                int(
+                    os.environ.get(
+                        "RESUME_CACHE_MAX_ENTRIES", ResumeCache.DEFAULT_MAX_ENTRIES
+                    )
+                ),
+            )
+        return _resume_cache
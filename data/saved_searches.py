@@ -0,0 +1,156 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+
+@dataclass
+class SavedSearch:
+    """
+    Search criteria a user saved to be told about new matching resumes.
+    `checked_at` is None until the search is first checked.
+    """
+
+    search_id: int
+    user_id: int
+    chat_id: int
+    criteria: dict
+    checked_at: Optional[float] = None
+
+
+class SavedSearches:
+    """
+    Persistent SQLite store of saved searches, along with the resumes each one
+    has already notified its user about.
+    """
+
+    DEFAULT_PATH = "saved_searches.sqlite3"
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS saved_searches ("
+                " search_id INTEGER PRIMARY KEY,"
+                " user_id INTEGER NOT NULL,"
+                " chat_id INTEGER NOT NULL,"
+                " criteria TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " checked_at REAL)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS notified_resumes ("
+                " search_id INTEGER NOT NULL,"
+                " link TEXT NOT NULL,"
+                " PRIMARY KEY (search_id, link))"
+            )
+
+    def add(self, user_id: int, chat_id: int, criteria: dict) -> int:
+        """
+        Saves a search and returns its ID.
+        """
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "INSERT INTO saved_searches (user_id, chat_id, criteria, created_at)"
+                " VALUES (?, ?, ?, ?)",
+                (user_id, chat_id, json.dumps(criteria), time.time()),
+            )
+            return cursor.lastrowid
+
+    def remove(self, user_id: int, search_id: int) -> bool:
+        """
+        Deletes one of the user's saved searches.
+
+        Returns:
+            bool: True if the user had such a search.
+        """
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "DELETE FROM saved_searches WHERE search_id = ? AND user_id = ?",
+                (search_id, user_id),
+            )
+            if not cursor.rowcount:
+                return False
+            self._connection.execute(
+                "DELETE FROM notified_resumes WHERE search_id = ?", (search_id,)
+            )
+            return True
+
+    def for_user(self, user_id: int) -> List[SavedSearch]:
+        """
+        Lists the user's saved searches, oldest first.
+        """
+        return self._select("WHERE user_id = ? ORDER BY search_id", (user_id,))
+
+    def all(self) -> List[SavedSearch]:
+        """
+        Lists every saved search, the longest unchecked first.
+        """
+        return self._select("ORDER BY checked_at IS NOT NULL, checked_at, search_id")
+
+    def unnotified(self, search_id: int, links: Iterable[str]) -> List[str]:
+        """
+        Returns the resume links the search has not notified its user about yet,
+        in the given order.
+        """
+        links = list(links)
+        with self._lock:
+            notified = {
+                link
+                for (link,) in self._connection.execute(
+                    "SELECT link FROM notified_resumes WHERE search_id = ?",
+                    (search_id,),
+                )
+            }
+        return [link for link in links if link not in notified]
+
+    def mark_notified(self, search_id: int, links: Iterable[str]) -> None:
+        """
+        Records resumes the search has notified its user about, so they are not
+        sent again.
+        """
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO notified_resumes (search_id, link) VALUES (?, ?)",
+                [(search_id, link) for link in links],
+            )
+
+    def mark_checked(self, search_id: int) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE saved_searches SET checked_at = ? WHERE search_id = ?",
+                (time.time(), search_id),
+            )
+
+    def _select(self, clause, parameters=()):
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT search_id, user_id, chat_id, criteria, checked_at"
+                f" FROM saved_searches {clause}",
+                parameters,
+            ).fetchall()
+        return [
+            SavedSearch(search_id, user_id, chat_id, json.loads(criteria), checked_at)
+            for search_id, user_id, chat_id, criteria, checked_at in rows
+        ]
+
+
+_saved_searches = None
+_saved_searches_lock = threading.Lock()
+
+
+def get_saved_searches() -> SavedSearches:
+    """
+    Returns the shared saved search store, kept at SAVED_SEARCHES_PATH.
+    """
+    global _saved_searches
+    with _saved_searches_lock:
+        if _saved_searches is None:
+            _saved_searches = SavedSearches(
+                os.environ.get("SAVED_SEARCHES_PATH", SavedSearches.DEFAULT_PATH)
+            )
+        return _saved_searches
@@ -0,0 +1,237 @@
+import bisect
+import os
+import threading
+from dataclasses import replace
+from typing import Dict, List, Optional, Tuple
+
+from data.resume import Resume
+from data.resume_cache import ResumeCache, get_resume_cache
+from utils.bm25 import get_bm25_index
+from utils.dedup import NearDuplicateFilter
+from utils.filters import BM25_RANKING, FIELD_RANKING
+from utils.normalize import parse_city, text_terms
+from utils.scoring import KeywordQuery
+
+# Experience levels of the search criteria as [min, max] months; None is unbounded.
+EXPERIENCE_MONTHS = {
+    "work.ua": {
+        "0": (0, 0),  # No experience
+        "1": (0, 12),  # Up to 1 year
+        "2": (12, 24),  # From 1 to 2
+        "3": (24, 60),  # From 2 to 5
+        "4": (60, None),  # More than 5
+    },
+    "robota.ua": {
+        "0": (0, 0),  # With no experience
+        "1": (0, 12),  # Up to 1 year
+        "2": (12, 24),  # From 1 to 2
+        "3": (24, 60),  # From 2 to 5
+        "4": (60, 120),  # From 5 to 10
+        "5": (120, None),  # More than 10
+    },
+}
+
+
+class _RangeIndex:
+    """
+    Documents sorted by an integer attribute, for range lookups with bisect.
+    """
+
+    def __init__(self, values: List[Tuple[int, int]]):
+        values.sort()
+        self.keys = [value for value, _ in values]
+        self.docs = [doc for _, doc in values]
+
+    def between(self, low: Optional[int], high: Optional[int]) -> List[int]:
+        start = 0 if low is None else bisect.bisect_left(self.keys, low)
+        end = len(self.keys) if high is None else bisect.bisect_right(self.keys, high)
+        return self.docs[start:end]
+
+
+class _Snapshot:
+    """
+    The index structures over one set of resumes; rebuilt and swapped as a whole.
+    """
+
+    def __init__(self, entries: List[Tuple[str, Resume]]):
+        self.resumes = [resume for _, resume in entries]
+        self.terms: Dict[str, List[int]] = {}
+        self.cities: Dict[str, List[int]] = {}
+        self.sites: Dict[str, List[int]] = {}
+        experience, salary = [], []
+
+        for doc, (site, resume) in enumerate(entries):
+            terms = set(text_terms(resume.position))
+            terms.update(resume.skills)
+            for term in terms:
+                self.terms.setdefault(term, []).append(doc)
+            if resume.city_id is not None:
+                self.cities.setdefault(resume.city_id, []).append(doc)
+            self.sites.setdefault(site, []).append(doc)
+            if resume.experience_months is not None:
+                experience.append((resume.experience_months, doc))
+            if resume.salary_uah is not None:
+                salary.append((resume.salary_uah, doc))
+
+        self.experience = _RangeIndex(experience)
+        self.salary = _RangeIndex(salary)
+
+
+class SearchIndex:
+    """
+    In-memory search index over every resume in the resume cache, so searches
+    repeating earlier ones are answered in milliseconds without crawling.
+
+    Resumes are indexed by the words of their position and their skills, by city
+    and by site, and sorted by experience and salary for range lookups. The index
+    is a snapshot of the cache: `rebuild` takes a new one, and `start` keeps
+    taking one every `refresh_interval` seconds in the background.
+    """
+
+    DEFAULT_REFRESH_INTERVAL = 5 * 60
+
+    def __init__(
+        self,
+        cache: Optional[ResumeCache] = None,
+        refresh_interval: float = DEFAULT_REFRESH_INTERVAL,
+    ):
+        self.cache = cache or get_resume_cache()
+        self.refresh_interval = refresh_interval
+        self._snapshot = _Snapshot([])
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def __len__(self) -> int:
+        return len(self._snapshot.resumes)
+
+    def rebuild(self) -> None:
+        """
+        Indexes the resumes currently in the resume cache, and adds the new or
+        changed ones to the shared BM25 index.
+        """
+        snapshot = _Snapshot([(site, resume) for site, _, resume in self.cache.items()])
+        get_bm25_index().add_many(snapshot.resumes)
+        self._snapshot = snapshot
+
+    def start(self) -> None:
+        """
+        Builds the index on a background thread and rebuilds it periodically.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._refresh, name="search-index", daemon=True
+            )
+            self._thread.start()
+
+    def close(self) -> None:
+        """
+        Stops the background refresh.
+        """
+        self._stopped.set()
+
+    def search(
+        self,
+        position: Optional[str],
+        location: Optional[str] = None,
+        keywords: Optional[List[str]] = None,
+        experience: Optional[str] = None,
+        salary: Optional[str] = None,
+        limit: Optional[int] = None,
+        site: Optional[str] = None,
+        ranking: str = FIELD_RANKING,
+    ) -> List[Resume]:
+        """
+        Finds the indexed resumes matching the criteria of a site search.
+
+        A resume matches if every word of the position appears in its position or
+        skills, and if it is in the location and within the experience level and
+        salary when these are given; resumes that do not state them do not match.
+
+        Args:
+            position (str): The job position to search for.
+            location (str, optional): The location to search in. Defaults to None.
+            keywords (List[str], optional): The keywords to rank by. Defaults to None.
+            experience (str, optional): The experience level, as for `site`. Defaults to None.
+            salary (str, optional): The maximum salary in UAH. Defaults to None.
+            limit (int, optional): The maximum number of resumes to return. Defaults to None.
+            site (str, optional): Only return resumes from this site. Experience levels
+                are read as for work.ua unless this is robota.ua. Defaults to None.
+            ranking (str, optional): How to rank the matches, as for
+                `sort_resumes_by_relevance`. Defaults to FIELD_RANKING.
+
+        Returns:
+            List[Resume]: The matching resumes, most relevant first, without
+            near-duplicates.
+        """
+        snapshot = self._snapshot
+        postings = [snapshot.terms.get(term, []) for term in text_terms(position)]
+
+        if location:
+            postings.append(snapshot.cities.get(parse_city(location), []))
+        if site:
+            postings.append(snapshot.sites.get(site, []))
+        if experience is not None:
+            levels = EXPERIENCE_MONTHS.get(site, EXPERIENCE_MONTHS["work.ua"])
+            if experience in levels:
+                postings.append(snapshot.experience.between(*levels[experience]))
+        if salary and str(salary).isdigit():
+            postings.append(snapshot.salary.between(None, int(salary)))
+
+        if postings:
+            postings.sort(key=len)
+            docs = sorted(set(postings[0]).intersection(*postings[1:]))
+        else:
+            docs = range(len(snapshot.resumes))
+
+        # Indexed resumes are shared between searches, so they are scored aside
+        # and only the returned copies get a relevance score.
+        resumes = [snapshot.resumes[doc] for doc in docs]
+        if ranking == BM25_RANKING:
+            bm25_scores = get_bm25_index().scores(keywords or [])
+            scores = [round(bm25_scores.get(resume.link, 0.0), 2) for resume in resumes]
+        else:
+            scores = KeywordQuery(keywords).score_many(resumes)
+        ranked = sorted(range(len(resumes)), key=scores.__getitem__, reverse=True)
+
+        duplicates = NearDuplicateFilter()
+        results = []
+        for i in ranked:
+            if limit is not None and len(results) >= limit:
+                break
+            if not duplicates.is_duplicate(resumes[i]):
+                result = replace(resumes[i])
+                result.relevance_score = scores[i]
+                results.append(result)
+        duplicates.index.flush()
+        return results
+
+    def _refresh(self):
+        while not self._stopped.is_set():
+            try:
+                self.rebuild()
+            except Exception as e:
+                print(f"Error rebuilding search index: {e}")
+            self._stopped.wait(self.refresh_interval)
+
+
+_search_index = None
+_search_index_lock = threading.Lock()
+
+
+def get_search_index() -> SearchIndex:
+    """
+    Returns the shared search index over the resume cache, refreshed every
+    SEARCH_INDEX_REFRESH_INTERVAL seconds once started.
+    """
+    global _search_index
+    with _search_index_lock:
+        if _search_index is None:
+            _search_index = SearchIndex(
+                refresh_interval=float(
+                    os.environ.get(
+                        "SEARCH_INDEX_REFRESH_INTERVAL",
+                        SearchIndex.DEFAULT_REFRESH_INTERVAL,
+                    )
+                )
+            )
+        return _search_index
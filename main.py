@@ -1,6 +1,7 @@
 import os
 
 from telegram.ext import (
+    CallbackQueryHandler,
     ConversationHandler,
     CommandHandler,
     MessageHandler,
@@ -20,13 +21,25 @@ from telegram_bot.telegram_bot import (
     set_keywords,
     fetch_resumes,
     cancel,
+    stop_search,
+    STOP_SEARCH,
     SET_YEARS_OF_EXPERIENCE,
     set_years_of_experience,
     SET_EXPECTED_SALARY,
     set_expected_salary,
+    precrawl_popular_searches,
+    PRECRAWL_INTERVAL,
+    save_search,
+    list_saved_searches,
+    delete_saved_search,
+    check_saved_searches,
+    SAVED_SEARCH_INTERVAL,
+    ROBOTA_UA_BACKEND,
 )
 
 from telegram_bot.telegram_bot import start
+from data.search_index import get_search_index
+from parsers.browser_pool import get_browser_pool
 
 
 def main() -> None:
@@ -61,8 +74,34 @@ def main() -> None:
     application.add_handler(conv_handler)
 
     application.add_handler(CommandHandler("start", start))
+    application.add_handler(CommandHandler("cancel", cancel))
+    application.add_handler(CommandHandler("save", save_search))
+    application.add_handler(CommandHandler("searches", list_saved_searches))
+    application.add_handler(CommandHandler("unsave", delete_saved_search))
+    application.add_handler(
+        CallbackQueryHandler(stop_search, pattern=f"^{STOP_SEARCH}$")
+    )
+
+    if PRECRAWL_INTERVAL > 0:
+        application.job_queue.run_repeating(
+            precrawl_popular_searches, interval=PRECRAWL_INTERVAL
+        )
+    if SAVED_SEARCH_INTERVAL > 0:
+        application.job_queue.run_repeating(
+            check_saved_searches, interval=SAVED_SEARCH_INTERVAL
+        )
 
-    application.run_polling()
+    browser_pool = get_browser_pool()
+    # The api backend never opens a browser, so it needs no chromedriver either.
+    if ROBOTA_UA_BACKEND == "browser":
+        browser_pool.start()
+    search_index = get_search_index()
+    search_index.start()
+    try:
+        application.run_polling()
+    finally:
+        search_index.close()
+        browser_pool.close()
 
 
 if __name__ == "__main__":
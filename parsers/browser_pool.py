@@ -0,0 +1,208 @@
+import os
+import queue
+import threading
+from contextlib import ExitStack, contextmanager
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.webdriver.chrome.options import Options as ChromeOptions
+from webdriver_manager.chrome import ChromeDriverManager
+
+
+class WebDriverConfig:
+    _driver_path = None
+    _driver_path_lock = threading.Lock()
+
+    @staticmethod
+    def get_driver_path():
+        """
+        Resolves the chromedriver path, downloading the driver on first use only.
+        """
+        with WebDriverConfig._driver_path_lock:
+            if WebDriverConfig._driver_path is None:
+                chrome_install = ChromeDriverManager().install()
+
+                folder = os.path.dirname(chrome_install)
+                chromedriver_path = os.path.join(folder, "chromedriver.exe")
+                if not os.path.exists(chromedriver_path):
+                    chromedriver_path = chrome_install
+
+                WebDriverConfig._driver_path = chromedriver_path
+            return WebDriverConfig._driver_path
+
+    @staticmethod
+    def get_driver():
+        service = ChromeService(WebDriverConfig.get_driver_path())
+
+        options = ChromeOptions()
+        options.headless = True
+        options.add_argument("--disable-blink-features=AutomationControlled")
+        options.add_argument("--incognito")
+
+        driver = webdriver.Chrome(service=service, options=options)
+
+        return driver
+
+
+class PooledDriver:
+    """
+    A pooled WebDriver that counts the pages loaded through it.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages_loaded = 0
+
+    def get(self, url):
+        self.pages_loaded += 1
+        return self.driver.get(url)
+
+    def is_healthy(self):
+        try:
+            return self.driver.execute_script("return 1") == 1
+        except WebDriverException:
+            return False
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except WebDriverException:
+            pass
+
+    def __getattr__(self, name):
+        return getattr(self.driver, name)
+
+
+class BrowserPool:
+    """
+    A pool of warm headless Chrome instances leased to one crawl job at a time.
+
+    At most `size` browsers exist at once. Leased browsers are health-checked,
+    recycled after `max_pages_per_driver` page loads, and discarded if the job
+    using them raises.
+
+    Usage:
+        with get_browser_pool().lease() as driver:
+            driver.get(url)
+    """
+
+    DEFAULT_SIZE = 2
+    DEFAULT_MAX_PAGES_PER_DRIVER = 200
+
+    def __init__(
+        self,
+        size=DEFAULT_SIZE,
+        max_pages_per_driver=DEFAULT_MAX_PAGES_PER_DRIVER,
+        driver_factory=WebDriverConfig.get_driver,
+    ):
+        self.size = size
+        self.max_pages_per_driver = max_pages_per_driver
+        self._driver_factory = driver_factory
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._closed = False
+
+    def start(self):
+        """
+        Resolves the chromedriver path up front so the first search does not pay for it.
+        """
+        WebDriverConfig.get_driver_path()
+
+    @contextmanager
+    def lease(self, timeout=None):
+        """
+        Leases a browser for the duration of the `with` block.
+
+        Args:
+            timeout (float, optional): Seconds to wait for a free browser. Defaults to None.
+
+        Raises:
+            TimeoutError: If no browser becomes free within `timeout`.
+        """
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("No browser available")
+
+        driver = None
+        try:
+            driver = self._acquire()
+            yield driver
+        except GeneratorExit:
+            # A generator holding the lease was closed early; the browser is fine.
+            self._release(driver)
+            raise
+        except BaseException:
+            if driver is not None:
+                driver.quit()
+            raise
+        else:
+            self._release(driver)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def lease_many(self, count, timeout=None):
+        """
+        Leases up to `count` browsers: waits for the first one, then takes only
+        the others that are free right away, so jobs never wait on each other.
+
+        Args:
+            count (int): Maximum number of browsers to lease.
+            timeout (float, optional): Seconds to wait for the first browser. Defaults to None.
+
+        Raises:
+            TimeoutError: If no browser becomes free within `timeout`.
+        """
+        with ExitStack() as stack:
+            drivers = [stack.enter_context(self.lease(timeout))]
+            for _ in range(count - 1):
+                try:
+                    drivers.append(stack.enter_context(self.lease(timeout=0)))
+                except TimeoutError:
+                    break
+            yield drivers
+
+    def close(self):
+        """
+        Quits all idle browsers. Browsers still leased are quit when returned.
+        """
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().quit()
+            except queue.Empty:
+                return
+
+    def _acquire(self):
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                return PooledDriver(self._driver_factory())
+
+            if driver.is_healthy():
+                return driver
+            driver.quit()
+
+    def _release(self, driver):
+        if self._closed or driver.pages_loaded >= self.max_pages_per_driver:
+            driver.quit()
+        else:
+            self._idle.put(driver)
+
+
+_browser_pool = None
+_browser_pool_lock = threading.Lock()
+
+
+def get_browser_pool():
+    """
+    Returns the shared browser pool, sized by the BROWSER_POOL_SIZE environment variable.
+    """
+    global _browser_pool
+    with _browser_pool_lock:
+        if _browser_pool is None:
+            _browser_pool = BrowserPool(
+                int(os.environ.get("BROWSER_POOL_SIZE", BrowserPool.DEFAULT_SIZE))
+            )
+        return _browser_pool
@@ -0,0 +1,428 @@
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+# Responses worth retrying: the site is throttling us or briefly unavailable.
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+TRANSIENT_ERRORS = (
+    aiohttp.ClientConnectionError,
+    aiohttp.ClientPayloadError,
+    asyncio.TimeoutError,
+)
+
+
+@dataclass
+class Page:
+    """
+    A fetched page. `not_modified` is set when a conditional request got a 304,
+    in which case `body` is empty.
+    """
+
+    url: str
+    body: bytes
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    not_modified: bool = False
+
+
+class CircuitOpenError(aiohttp.ClientError):
+    """
+    Raised instead of sending a request to a host whose circuit is open.
+    """
+
+
+class RateLimiter:
+    """
+    Token bucket that lets requests start at `requests_per_second` on average,
+    in bursts of up to `burst` requests.
+
+    The rate adapts to the server: `throttle` halves it, down to `MIN_RATE`, and
+    holds every request back for the server's Retry-After, and each successful
+    request wins back a small share of the configured rate.
+    """
+
+    MIN_RATE = 0.5
+    RECOVERY = 0.05
+
+    def __init__(self, requests_per_second, burst=1):
+        self.max_rate = requests_per_second or 0.0
+        self.rate = self.max_rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        # A plain lock, as the limiter is shared by crawlers on different event
+        # loops; nothing is awaited while it is held.
+        self._lock = threading.Lock()
+
+    async def wait(self):
+        if not self.rate:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            if now > self._updated:
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+            # Tokens go negative as later requests reserve future slots.
+            self._tokens -= 1
+            delay = self._updated - now + max(-self._tokens, 0.0) / self.rate
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def throttle(self, retry_after=None):
+        """
+        Halves the rate after the server pushed back, and pauses requests for
+        `retry_after` seconds if given.
+        """
+        if not self.rate:
+            return
+        with self._lock:
+            self.rate = max(self.MIN_RATE, self.rate / 2)
+            self._tokens = min(self._tokens, 0.0)
+            if retry_after:
+                self._updated = max(self._updated, time.monotonic() + retry_after)
+
+    def recover(self):
+        if self.rate:
+            with self._lock:
+                self.rate = min(
+                    self.max_rate, self.rate + self.max_rate * self.RECOVERY
+                )
+
+    def limit(self, requests_per_second):
+        """
+        Caps the rate at `requests_per_second`, for a crawler that asks for less
+        than the limiter was created with.
+        """
+        if requests_per_second and requests_per_second < (self.max_rate or 0):
+            with self._lock:
+                self.max_rate = requests_per_second
+                self.rate = min(self.rate, requests_per_second)
+
+
+class CircuitBreaker:
+    """
+    Stops requests to a host that keeps failing.
+
+    After `failure_threshold` failed requests in a row the circuit opens, and
+    requests fail fast with CircuitOpenError for `reset_timeout` seconds. Then a
+    single trial request is let through: if it succeeds the circuit closes again,
+    otherwise it stays open for another `reset_timeout`.
+    """
+
+    DEFAULT_FAILURE_THRESHOLD = 5
+    DEFAULT_RESET_TIMEOUT = 30
+
+    def __init__(
+        self,
+        failure_threshold=DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout=DEFAULT_RESET_TIMEOUT,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+
+    @property
+    def is_open(self):
+        return self._opened_at is not None
+
+    def check(self, host):
+        """
+        Raises CircuitOpenError unless a request may be sent now.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return
+            now = time.monotonic()
+            if now - self._opened_at < self.reset_timeout:
+                raise CircuitOpenError(
+                    f"{host} keeps failing; requests to it are paused for up to "
+                    f"{self.reset_timeout:.0f} seconds"
+                )
+            # Half-open: this request is the trial, later ones wait for its outcome.
+            self._opened_at = now
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+_circuit_breakers = {}
+_circuit_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(host) -> CircuitBreaker:
+    """
+    Returns the circuit breaker of a host, shared by every crawler so that all
+    searches back off from a failing site together.
+    """
+    with _circuit_breakers_lock:
+        if host not in _circuit_breakers:
+            _circuit_breakers[host] = CircuitBreaker()
+        return _circuit_breakers[host]
+
+
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(host, requests_per_second) -> RateLimiter:
+    """
+    Returns the rate limiter of a host, shared by every crawler so that
+    concurrent searches together stay within `requests_per_second` and all slow
+    down when the host pushes back. The lowest rate any crawler asked for wins.
+    """
+    with _rate_limiters_lock:
+        if host not in _rate_limiters:
+            _rate_limiters[host] = RateLimiter(requests_per_second)
+        rate_limiter = _rate_limiters[host]
+    rate_limiter.limit(requests_per_second)
+    return rate_limiter
+
+
+def _retry_after(headers):
+    """
+    Reads the Retry-After header, given in seconds or as an HTTP date.
+    """
+    value = headers.get("Retry-After") if headers else None
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class AsyncCrawler:
+    """
+    Fetches pages concurrently over a single pooled, keep-alive HTTP session.
+
+    Requests to each host are capped by `concurrency_per_host` simultaneous
+    connections and paced by a rate limiter shared by all crawlers of the host,
+    which slows down when the host answers 429 Too Many Requests. Requests that time out, fail to connect or
+    get a 429 or 5xx are retried up to `max_retries` times with exponential
+    backoff and jitter, and a host that keeps failing trips its circuit breaker,
+    so further requests fail fast until it recovers.
+
+    Usage:
+        async with AsyncCrawler() as crawler:
+            pages = await crawler.fetch_many(urls)
+    """
+
+    DEFAULT_CONCURRENCY_PER_HOST = 10
+    DEFAULT_REQUESTS_PER_SECOND = 20
+    DEFAULT_TIMEOUT = 30
+    DEFAULT_CONNECT_TIMEOUT = 10
+    DEFAULT_MAX_RETRIES = 3
+    BACKOFF_BASE = 0.5
+    BACKOFF_MAX = 10
+    # Retry-After longer than this is not waited out; the request fails instead.
+    MAX_RETRY_AFTER = 60
+
+    HEADERS = {
+        "User-Agent": (
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+            "(KHTML, like Gecko) Chrome/126.0 Safari/537.36"
+        ),
+        "Accept-Language": "uk-UA,uk;q=0.9,en;q=0.8",
+    }
+
+    def __init__(
+        self,
+        concurrency_per_host=DEFAULT_CONCURRENCY_PER_HOST,
+        requests_per_second=DEFAULT_REQUESTS_PER_SECOND,
+        timeout=DEFAULT_TIMEOUT,
+        max_retries=DEFAULT_MAX_RETRIES,
+    ):
+        self.concurrency_per_host = concurrency_per_host
+        self.requests_per_second = requests_per_second
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._session = None
+        self._semaphores = {}
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(
+            limit_per_host=self.concurrency_per_host, ttl_dns_cache=300
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            headers=self.HEADERS,
+            timeout=aiohttp.ClientTimeout(
+                total=self.timeout,
+                connect=min(self.timeout, self.DEFAULT_CONNECT_TIMEOUT),
+            ),
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._session.close()
+        self._session = None
+
+    def _host_limits(self, url):
+        host = urlsplit(url).netloc
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.concurrency_per_host)
+        return self._semaphores[host], get_rate_limiter(host, self.requests_per_second)
+
+    async def _send(self, url, request):
+        """
+        Runs `request`, a coroutine function sending one request to `url`, within
+        the limits of its host, retrying it on transient failures.
+        """
+        host = urlsplit(url).netloc
+        semaphore, rate_limiter = self._host_limits(url)
+        breaker = get_circuit_breaker(host)
+
+        for attempt in range(self.max_retries + 1):
+            breaker.check(host)
+            retry_after = None
+            try:
+                async with semaphore:
+                    await rate_limiter.wait()
+                    result = await request()
+            except aiohttp.ClientResponseError as e:
+                if e.status not in RETRY_STATUSES:
+                    # The host is up and answered; the request itself is bad.
+                    breaker.record_success()
+                    raise
+                retry_after = _retry_after(e.headers)
+                if e.status == 429 or retry_after is not None:
+                    rate_limiter.throttle(retry_after)
+                error = e
+            except TRANSIENT_ERRORS as e:
+                error = e
+            else:
+                rate_limiter.recover()
+                breaker.record_success()
+                return result
+
+            breaker.record_failure()
+            if attempt == self.max_retries:
+                raise error
+            if retry_after is None:
+                # Full jitter keeps concurrent retries from hitting the host in sync.
+                delay = random.uniform(
+                    0, min(self.BACKOFF_MAX, self.BACKOFF_BASE * 2**attempt)
+                )
+            elif retry_after <= self.MAX_RETRY_AFTER:
+                delay = retry_after
+            else:
+                raise error
+            await asyncio.sleep(delay)
+
+    async def fetch(self, url):
+        """
+        Fetches a single page and returns its raw body.
+
+        Args:
+            url (str): The URL to fetch.
+
+        Returns:
+            bytes: The response body.
+
+        Raises:
+            aiohttp.ClientError: If the request fails or returns an error status.
+        """
+        page = await self.fetch_page(url)
+        return page.body
+
+    async def fetch_page(self, url, etag=None, last_modified=None):
+        """
+        Fetches a single page, conditionally if validators from an earlier
+        response are given.
+
+        Args:
+            url (str): The URL to fetch.
+            etag (str, optional): ETag to send as If-None-Match. Defaults to None.
+            last_modified (str, optional): Last-Modified to send as If-Modified-Since.
+                Defaults to None.
+
+        Returns:
+            Page: The fetched page and its validators.
+
+        Raises:
+            aiohttp.ClientError: If the request fails or returns an error status
+                after all retries, or the circuit of the host is open.
+            asyncio.TimeoutError: If the last retry times out.
+        """
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        async def get():
+            async with self._session.get(url, headers=headers) as response:
+                if response.status == 304:
+                    return Page(url, b"", etag, last_modified, not_modified=True)
+
+                response.raise_for_status()
+                return Page(
+                    url,
+                    await response.read(),
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                )
+
+        return await self._send(url, get)
+
+    async def post_json(self, url, payload):
+        """
+        Posts a JSON payload and returns the decoded JSON response.
+
+        Raises:
+            aiohttp.ClientError: If the request fails or returns an error status
+                after all retries, or the circuit of the host is open.
+        """
+
+        async def post():
+            async with self._session.post(url, json=payload) as response:
+                response.raise_for_status()
+                return await response.json(content_type=None)
+
+        return await self._send(url, post)
+
+    async def fetch_many(self, urls):
+        """
+        Fetches several pages concurrently, preserving the order of `urls`.
+        """
+        return await asyncio.gather(*(self.fetch(url) for url in urls))
+
+    async def fetch_pages(self, requests, return_exceptions=False):
+        """
+        Fetches several pages concurrently, preserving the order of `requests`.
+
+        Args:
+            requests (list): Tuples of URL, ETag and Last-Modified, as taken by `fetch_page`.
+            return_exceptions (bool, optional): Return the error of a failed fetch in
+                place of its page instead of raising it. Defaults to False.
+
+        Returns:
+            list: A list of Page objects.
+        """
+        return await asyncio.gather(
+            *(self.fetch_page(*request) for request in requests),
+            return_exceptions=return_exceptions,
+        )
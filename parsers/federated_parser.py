@@ -0,0 +1,191 @@
+import asyncio
+from contextlib import aclosing
+
+import aiohttp
+from parsers.robota_ua_parser import RobotaUAParser
+from parsers.streams import merge
+from parsers.work_ua_parser import WorkUAParser
+from utils.dedup import adeduplicate
+from utils.filters import FIELD_RANKING, TopK, sort_resumes_by_relevance
+
+
+class FederatedParser:
+    """
+    Searches work.ua and robota.ua concurrently for the same criteria and streams
+    their resumes as one, so a search takes as long as the slower site rather
+    than both in turn.
+
+    Criteria are given as for work.ua. Resumes of both sites are normalized the
+    same way, which lets `utils.dedup` recognize a candidate who posted the same
+    resume on both sites.
+    """
+
+    SITE = "both"
+
+    # work.ua experience levels as robota.ua ones. robota.ua splits "more than
+    # 5 years" into 5 to 10 and more than 10, of which the first is searched.
+    ROBOTA_UA_EXPERIENCE = {
+        "0": "0",
+        "1": "1",
+        "2": "2",
+        "3": "3",
+        "4": "4",
+    }
+
+    @staticmethod
+    async def fetch_resumes_async(
+        position,
+        location=None,
+        keywords=None,
+        experience=None,
+        salary=None,
+        limit=None,
+        ranking=FIELD_RANKING,
+        **options,
+    ):
+        """
+        Fetches resumes from both sites, ranked together.
+
+        Args:
+            position (str): The job position to search for.
+            location (str, optional): The location to search in. Defaults to None.
+            keywords (str, optional): The keywords to search for. Defaults to None.
+            experience (int, optional): The experience to search for. Defaults to None.
+            salary (int, optional): The salary to search for. Defaults to None.
+            limit (int, optional): The maximum number of resumes to return. Defaults to None.
+            ranking (str, optional): FIELD_RANKING, or BM25_RANKING to rank by BM25 once
+                the crawl is over, without pruning it. Defaults to FIELD_RANKING.
+            **options: Crawl options passed on to `aiter_resumes`.
+
+        Returns:
+            list: A list of Resume objects.
+        """
+        top_k = TopK(limit, keywords) if limit and ranking == FIELD_RANKING else None
+        resumes = []
+
+        try:
+            async for resume in adeduplicate(
+                FederatedParser.aiter_resumes(
+                    position, location, experience, salary, top_k=top_k, **options
+                )
+            ):
+                if top_k:
+                    top_k.push(resume)
+                else:
+                    resumes.append(resume)
+
+        except Exception as e:
+            print(f"Error fetching resumes: {e}")
+
+        if top_k:
+            return top_k.results()
+        return sort_resumes_by_relevance(resumes, keywords or [], limit, ranking)
+
+    @staticmethod
+    async def aiter_resumes(
+        position,
+        location=None,
+        experience=None,
+        salary=None,
+        top_k=None,
+        max_pages=None,
+        max_details=None,
+        use_cache=True,
+        robota_ua_backend="browser",
+        executor=None,
+        progress=None,
+        incremental=False,
+    ):
+        """
+        Yields resumes from both sites as soon as either parses one.
+
+        A site that fails is reported and dropped; the other one carries on.
+
+        Args:
+            position (str): The job position to search for.
+            location (str, optional): The location to search in. Defaults to None.
+            experience (int, optional): The experience to search for. Defaults to None.
+            salary (int, optional): The salary to search for. Defaults to None.
+            top_k (TopK, optional): The caller's running top K, shared by both sites.
+                Defaults to None.
+            max_pages (int, optional): Maximum result pages to crawl per site.
+                Defaults to None.
+            max_details (int, optional): Maximum resume pages to download per site.
+                Defaults to None.
+            use_cache (bool, optional): Reuse resumes from the resume cache. Defaults to True.
+            robota_ua_backend (str, optional): The robota.ua backend, "browser" or "api".
+            executor (Executor, optional): Runs the robota.ua browser crawl.
+            progress (CrawlProgress, optional): Updated with the pages fetched on both
+                sites. Defaults to None.
+            incremental (bool, optional): Crawl only the results that are new since the
+                last incremental crawl of the search. Defaults to False.
+
+        Yields:
+            Resume: The parsed resumes.
+        """
+        work_ua = WorkUAParser.aiter_resumes(
+            position,
+            location,
+            experience,
+            salary,
+            top_k=top_k,
+            max_pages=max_pages,
+            max_details=max_details,
+            use_cache=use_cache,
+            progress=progress,
+            incremental=incremental,
+        )
+        robota_ua = RobotaUAParser.aiter_resumes(
+            position,
+            location,
+            FederatedParser.ROBOTA_UA_EXPERIENCE.get(experience),
+            salary,
+            top_k=top_k,
+            max_pages=max_pages,
+            max_details=max_details,
+            use_cache=use_cache,
+            backend=robota_ua_backend,
+            executor=executor,
+            progress=progress,
+            incremental=incremental,
+        )
+
+        async with aclosing(
+            merge(
+                FederatedParser._guard(WorkUAParser.SITE, work_ua),
+                FederatedParser._guard(RobotaUAParser.SITE, robota_ua),
+            )
+        ) as resumes:
+            async for resume in resumes:
+                yield resume
+
+    @staticmethod
+    def query_key(position, location=None, experience=None, salary=None):
+        """
+        Identifies a search of both sites by the keys of its searches of each.
+        """
+        return (
+            WorkUAParser.query_key(position, location, experience, salary),
+            RobotaUAParser.query_key(
+                position,
+                location,
+                FederatedParser.ROBOTA_UA_EXPERIENCE.get(experience),
+                salary,
+            ),
+        )
+
+    @staticmethod
+    async def _guard(site, resumes):
+        """
+        Ends the stream of one site on error instead of failing the whole search.
+        """
+        try:
+            async with aclosing(resumes):
+                async for resume in resumes:
+                    yield resume
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Error fetching resumes from {site}: {e}")
+
+        except Exception as e:
+            print(f"Error parsing resumes from {site}: {e}")
@@ -0,0 +1,111 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+DEFAULT_QUEUE_SIZE = 32
+
+_parse_pool = None
+_parse_workers = None
+_parse_pool_lock = threading.Lock()
+
+
+def get_parse_pool():
+    """
+    Returns the shared process pool that parses pages, sized by the PARSE_WORKERS
+    environment variable (all cores by default).
+
+    Workers are spawned rather than forked, since the bot process runs threads.
+    """
+    global _parse_pool, _parse_workers
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            _parse_workers = int(os.environ.get("PARSE_WORKERS", os.cpu_count()))
+            _parse_pool = ProcessPoolExecutor(
+                max_workers=_parse_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _parse_pool
+
+
+async def fetch_and_parse(fetches, parse, queue_size=DEFAULT_QUEUE_SIZE):
+    """
+    Runs page fetches concurrently and parses every fetched page on the process pool
+    as soon as it arrives, yielding each result as soon as it is parsed.
+
+    At most `queue_size` pages are in flight at once, counting both the pages being
+    fetched and the fetched pages waiting for a parser. Once that many are, further
+    fetches do not start until the parsers take a page, so the network never runs
+    ahead of parsing and memory stays bounded however many pages are requested.
+
+    Args:
+        fetches (list): Coroutines that each fetch one page and return a key and the
+            arguments for `parse`, or None if the page needs no parsing.
+        parse (Callable): A picklable function run on the process pool.
+        queue_size (int, optional): Maximum pages being fetched or awaiting a parser.
+
+    Yields:
+        tuple: The key of each parsed page and the result of `parse`.
+    """
+    loop = asyncio.get_running_loop()
+    pool = get_parse_pool()
+    queue = asyncio.Queue()
+    slots = asyncio.Semaphore(queue_size)
+    results = asyncio.Queue()
+    finished = object()
+
+    async def produce(fetch):
+        try:
+            await slots.acquire()
+        except BaseException:
+            fetch.close()
+            raise
+
+        try:
+            item = await fetch
+        except BaseException:
+            slots.release()
+            raise
+        if item is None:
+            slots.release()
+        else:
+            # The slot is released once a parser takes the page.
+            queue.put_nowait(item)
+
+    async def consume():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            slots.release()
+            key, args = item
+            await results.put((key, await loop.run_in_executor(pool, parse, *args)))
+
+    consumers = [asyncio.create_task(consume()) for _ in range(_parse_workers)]
+
+    async def produce_all():
+        await asyncio.gather(*(produce(fetch) for fetch in fetches))
+        for _ in consumers:
+            queue.put_nowait(None)
+
+    tasks = [asyncio.create_task(produce_all()), *consumers]
+
+    async def run():
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            await results.put(finished)
+
+    runner = asyncio.create_task(run())
+    try:
+        while True:
+            result = await results.get()
+            if result is finished:
+                break
+            yield result
+        await runner
+    finally:
+        for task in [runner, *tasks]:
+            task.cancel()
+        await asyncio.gather(runner, *tasks, return_exceptions=True)
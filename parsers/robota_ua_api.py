@@ -0,0 +1,404 @@
+import asyncio
+import json
+from datetime import date
+
+import aiohttp
+from data.resume import Resume
+from data.high_water_marks import IncrementalCrawl
+from data.resume_cache import PageValidators, get_resume_cache
+from parsers.crawler import AsyncCrawler
+from utils.dedup import adeduplicate
+from utils.filters import FIELD_RANKING, TopK, sort_resumes_by_relevance
+from utils.normalize import parse_city, parse_salary_amount, to_uah
+
+
+class RobotaUAApiParser:
+    """
+    Fetches resumes from the JSON API behind the robota.ua single-page app over
+    plain HTTP, without a browser. Resumes map to the same `Resume` records, links
+    and cache entries as `RobotaUAParser`.
+    """
+
+    SITE = "robota.ua"
+    CANDIDATES_URL = "https://robota.ua/candidates"
+    SEARCH_URL = "https://employer-api.robota.ua/cvdb/resumes"
+    RESUME_URL = "https://employer-api.robota.ua/resume/{resume_id}"
+
+    PAGE_SIZE = 20
+
+    # API IDs of the cities, by the canonical city IDs of `utils.normalize`.
+    CITY_IDS = {
+        "kyiv": 1,
+        "lviv": 2,
+        "odesa": 3,
+        "dnipro": 4,
+        "kharkiv": 21,
+    }
+
+    @staticmethod
+    async def fetch_resumes_async(
+        position,
+        location=None,
+        keywords=None,
+        experience=None,
+        salary=None,
+        limit=None,
+        max_pages=None,
+        max_details=None,
+        use_cache=True,
+        concurrency=AsyncCrawler.DEFAULT_CONCURRENCY_PER_HOST,
+        requests_per_second=AsyncCrawler.DEFAULT_REQUESTS_PER_SECOND,
+        ranking=FIELD_RANKING,
+    ):
+        """
+        Fetches resumes from the Robota.ua API based on the given position, location,
+        keywords and limit. Takes the same arguments as `WorkUAParser.fetch_resumes_async`.
+
+        Returns:
+            list: A list of Resume objects.
+        """
+        top_k = TopK(limit, keywords) if limit and ranking == FIELD_RANKING else None
+        resumes = []
+
+        try:
+            async for resume in adeduplicate(
+                RobotaUAApiParser.aiter_resumes(
+                    position,
+                    location,
+                    experience,
+                    salary,
+                    top_k,
+                    max_pages,
+                    max_details,
+                    use_cache,
+                    concurrency,
+                    requests_per_second,
+                )
+            ):
+                if top_k:
+                    top_k.push(resume)
+                else:
+                    resumes.append(resume)
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Error fetching resumes: {e}")
+
+        except Exception as e:
+            print(f"Error parsing resumes: {e}")
+
+        if top_k:
+            return top_k.results()
+        return sort_resumes_by_relevance(resumes, keywords or [], limit, ranking)
+
+    @staticmethod
+    async def aiter_resumes(
+        position,
+        location=None,
+        experience=None,
+        salary=None,
+        top_k=None,
+        max_pages=None,
+        max_details=None,
+        use_cache=True,
+        concurrency=AsyncCrawler.DEFAULT_CONCURRENCY_PER_HOST,
+        requests_per_second=AsyncCrawler.DEFAULT_REQUESTS_PER_SECOND,
+        progress=None,
+        incremental=False,
+    ):
+        """
+        Yields resumes from the Robota.ua API as soon as they are fetched. Takes the
+        same arguments as `WorkUAParser.aiter_resumes`.
+
+        Yields:
+            Resume: The parsed resumes.
+        """
+        cache = get_resume_cache() if use_cache else None
+        best_possible_score = top_k.query.max_score if top_k else None
+        crawl = (
+            IncrementalCrawl(
+                RobotaUAApiParser.SITE,
+                RobotaUAApiParser.query_key(position, location, experience, salary),
+            )
+            if incremental
+            else None
+        )
+        page = 1
+        details_fetched = 0
+
+        async with AsyncCrawler(concurrency, requests_per_second) as crawler:
+            while True:
+                payload = RobotaUAApiParser._build_search_payload(
+                    position, location, experience, salary, page
+                )
+                results = await crawler.post_json(RobotaUAApiParser.SEARCH_URL, payload)
+                if progress is not None:
+                    progress.pages_scanned += 1
+
+                cards = RobotaUAApiParser._extract_resume_cards(results)
+                if not cards:
+                    if crawl is not None:
+                        crawl.finish()
+                    break
+                caught_up = crawl is not None and crawl.caught_up(
+                    RobotaUAApiParser._resume_id(card.link) for card in cards
+                )
+
+                if top_k:
+                    cards = [
+                        card
+                        for card in cards
+                        if top_k.can_improve(top_k.query.upper_bound(card))
+                    ]
+
+                cached = (
+                    cache.lookup_many(
+                        RobotaUAApiParser.SITE,
+                        [RobotaUAApiParser._resume_id(card.link) for card in cards],
+                    )
+                    if cache
+                    else [None] * len(cards)
+                )
+                missing = []
+                for i, entry in enumerate(cached):
+                    if entry and entry.fresh:
+                        yield entry.resume
+                    else:
+                        missing.append(i)
+                skipped = []
+                if max_details is not None:
+                    skipped = missing[max_details - details_fetched :]
+                    missing = missing[: max_details - details_fetched]
+
+                requests = []
+                for i in missing:
+                    validators = cached[i].validators if cached[i] else PageValidators()
+                    resume_id = RobotaUAApiParser._resume_id(cards[i].link)
+                    requests.append(
+                        (
+                            RobotaUAApiParser.RESUME_URL.format(resume_id=resume_id),
+                            validators.etag,
+                            validators.last_modified,
+                        )
+                    )
+                resume_pages = await crawler.fetch_pages(
+                    requests, return_exceptions=True
+                )
+                details_fetched += len(resume_pages)
+                if progress is not None:
+                    progress.details_fetched += len(resume_pages)
+
+                parsed_resumes, revalidated_ids, failed = [], [], set()
+                for i, resume_page in zip(missing, resume_pages):
+                    if isinstance(resume_page, BaseException):
+                        if not isinstance(
+                            resume_page, (aiohttp.ClientError, asyncio.TimeoutError)
+                        ):
+                            raise resume_page
+                        print(
+                            f"Error fetching resume at URL {cards[i].link}: {resume_page}"
+                        )
+                        failed.add(i)
+                        # Better a stale resume than none; it stays expired in the cache.
+                        if cached[i]:
+                            yield cached[i].resume
+                        continue
+
+                    resume_id = RobotaUAApiParser._resume_id(cards[i].link)
+                    content_hash = (
+                        None
+                        if resume_page.not_modified
+                        else PageValidators.hash_content(resume_page.body)
+                    )
+                    if cached[i] and (
+                        resume_page.not_modified
+                        or content_hash == cached[i].validators.content_hash
+                    ):
+                        revalidated_ids.append(resume_id)
+                        yield cached[i].resume
+                        continue
+
+                    try:
+                        data = json.loads(resume_page.body)
+                    except ValueError as e:
+                        print(f"Error reading resume at URL {cards[i].link}: {e}")
+                        failed.add(i)
+                        if cached[i]:
+                            yield cached[i].resume
+                        continue
+
+                    resume = RobotaUAApiParser.parse_resume(data, cards[i].link)
+                    if not resume:
+                        print(f"Failed to parse resume at URL: {resume_page.url}")
+                        continue
+
+                    validators = PageValidators(
+                        resume_page.etag, resume_page.last_modified, content_hash
+                    )
+                    parsed_resumes.append((resume_id, resume, validators))
+                    yield resume
+
+                if cache:
+                    cache.put_many(RobotaUAApiParser.SITE, parsed_resumes)
+                    cache.touch_many(RobotaUAApiParser.SITE, revalidated_ids)
+
+                if crawl is not None:
+                    # Resumes left unfetched are not marked, so the next crawl gets them.
+                    unresolved = failed.union(skipped)
+                    crawl.record(
+                        RobotaUAApiParser._resume_id(card.link)
+                        for i, card in enumerate(cards)
+                        if i not in unresolved
+                    )
+                    if caught_up:
+                        if cache:
+                            for resume in crawl.stored_resumes(cache):
+                                yield resume
+                        crawl.finish()
+                        break
+
+                if page * RobotaUAApiParser.PAGE_SIZE >= results.get("total", 0) or (
+                    max_pages is not None and page >= max_pages
+                ):
+                    if crawl is not None:
+                        crawl.finish()
+                    break
+                if max_details is not None and details_fetched >= max_details:
+                    break
+                if top_k and not top_k.can_improve(best_possible_score):
+                    break
+
+                page += 1
+
+    @staticmethod
+    def query_key(position, location=None, experience=None, salary=None):
+        """
+        Identifies a search by its first search request, built from the criteria
+        with case and spacing normalized as in `RobotaUAParser.query_key`.
+        """
+        payload = RobotaUAApiParser._build_search_payload(
+            " ".join(position.lower().split()),
+            location and location.strip().lower(),
+            experience,
+            salary,
+            1,
+        )
+        return f"{RobotaUAApiParser.SEARCH_URL}?{json.dumps(payload, sort_keys=True)}"
+
+    @staticmethod
+    def _build_search_payload(position, location, experience, salary, page):
+        """
+        Builds the search request for the Robota.ua API based on the given position,
+        location, minimum experience, and maximum salary.
+
+        Args:
+            position (str): The job position to search for.
+            location (str, optional): The location to search in. Defaults to None.
+            experience (str, optional): Years of experience required. Defaults to None.
+            salary (str, optional): Maximum expected salary, as typed by the user
+                (e.g. "20 000", "20k" or "$500"). A salary without an amount is not
+                sent. Defaults to None.
+            page (int): The page to search for, starting from 1.
+
+        Returns:
+            dict: The JSON payload of the search request.
+        """
+        salary_uah = to_uah(*parse_salary_amount(str(salary) if salary else None))
+        return {
+            "keyWords": position,
+            "cityId": RobotaUAApiParser.CITY_IDS.get(parse_city(location), 0),
+            "experienceIds": [experience] if experience else [],
+            "salary": {"from": None, "to": salary_uah},
+            "period": "ThreeMonths",
+            "sort": "UpdateDate",
+            "searchType": "default",
+            "page": page - 1,
+            "count": RobotaUAApiParser.PAGE_SIZE,
+        }
+
+    @staticmethod
+    def _extract_resume_cards(results):
+        """
+        Builds partial resumes from the documents of a search response.
+
+        A document shows the job position, city and expected salary; the remaining
+        attributes are left as None until the resume is fetched.
+        """
+        return [
+            Resume.parse(
+                document.get("speciality"),
+                location=document.get("cityName"),
+                salary=RobotaUAApiParser._format_salary(document),
+                link=f"{RobotaUAApiParser.CANDIDATES_URL}/{document['resumeId']}/",
+                partial=True,
+            )
+            for document in results.get("documents", [])
+            if document.get("resumeId") is not None
+        ]
+
+    @staticmethod
+    def _resume_id(link):
+        return link.rstrip("/").split("/")[-1]
+
+    @staticmethod
+    def parse_resume(data, link):
+        """
+        Parses a resume from the given API response.
+        """
+        try:
+            return Resume.parse(
+                data.get("speciality") or "Unknown",
+                RobotaUAApiParser._format_experience(data.get("experiences") or []),
+                RobotaUAApiParser._format_skills(data.get("skills")),
+                data.get("cityName") or "Unknown",
+                RobotaUAApiParser._format_salary(data),
+                link,
+            )
+
+        except Exception as e:
+            print(f"Error parsing individual resume: {e}")
+            return None
+
+    @staticmethod
+    def _format_experience(experiences):
+        """
+        Sums the duration of the work experience entries, counting open-ended ones up to today.
+        """
+        if not experiences:
+            return "Unknown"
+
+        total_months = 0
+        for entry in experiences:
+            start = entry.get("startWork")
+            if not start:
+                continue
+            start = date.fromisoformat(start[:10])
+            end = entry.get("endWork")
+            end = date.fromisoformat(end[:10]) if end else date.today()
+            total_months += max(
+                0, (end.year - start.year) * 12 + end.month - start.month
+            )
+
+        return f"{total_months // 12} years, {total_months % 12} months"
+
+    @staticmethod
+    def _format_skills(skills):
+        """
+        Joins skills given either as text or as a list of names or objects with a name.
+        """
+        if not skills:
+            return "Unknown"
+        if isinstance(skills, str):
+            return skills.lower()
+
+        names = [
+            skill.get("name", "") if isinstance(skill, dict) else str(skill)
+            for skill in skills
+        ]
+        return ", ".join(name.strip() for name in names if name.strip()).lower()
+
+    @staticmethod
+    def _format_salary(data):
+        salary = data.get("salary")
+        if not salary:
+            return "Unknown"
+        return f"{salary} {data.get('currencySign') or 'грн'}"
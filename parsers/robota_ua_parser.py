@@ -1,40 +1,29 @@
-import os
+import asyncio
+import queue
+import re
+from contextlib import aclosing
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.chrome.options import Options as ChromeOptions
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
+import soupsieve
 from data.resume import Resume
-from utils.filters import sort_resumes_by_relevance
-
-
-class WebDriverConfig:
-    @staticmethod
-    def get_driver():
-        chrome_install = ChromeDriverManager().install()
-
-        folder = os.path.dirname(chrome_install)
-        chromedriver_path = os.path.join(folder, "chromedriver.exe")
-
-        service = ChromeService(chromedriver_path)
-
-        options = ChromeOptions()
-        options.headless = True
-        options.add_argument(
-            "--disable-blink-features=AutomationControlled"
-        )
-        options.add_argument("--incognito")
-
-        driver = webdriver.Chrome(service=service, options=options)
-
-        return driver
+from data.high_water_marks import IncrementalCrawl
+from data.resume_cache import PageValidators, get_resume_cache
+from parsers.browser_pool import get_browser_pool
+from parsers.parse_pool import get_parse_pool
+from parsers.robota_ua_api import RobotaUAApiParser
+from parsers.soup import RESUME_BODY, make_soup
+from parsers.streams import iterate_in_thread
+from utils.dedup import deduplicate
+from utils.filters import FIELD_RANKING, TopK, sort_resumes_by_relevance
+from utils.normalize import find_city
 
 
 class RobotaUAParser:
+    SITE = "robota.ua"
     BASE_URL = "https://robota.ua/candidates"
 
     EXPERIENCE_MAP = {
@@ -46,13 +35,59 @@ class RobotaUAParser:
         "5": "5",  # More than 10
     }
 
+    # Thousands are space-separated, so numbers before the salary stay out of it.
+    CARD_SALARY_PATTERN = re.compile(r"(?<!\d)\d+(?:\s\d{3})*\s?(?:грн|\$|€)")
+
+    POSITION_SELECTOR = soupsieve.compile(
+        'p[class="santa-mt-10 santa-typo-secondary santa-text-black-700"]'
+    )
+    EXPERIENCE_SELECTOR = soupsieve.compile(
+        'span[class="santa-text-red-500 santa-whitespace-nowrap"]'
+    )
+    SKILLS_SELECTOR = soupsieve.compile(
+        'div[class="santa-m-0 santa-mb-20 760:santa-mb-40 last:santa-mb-0 '
+        'santa-typo-regular santa-text-black-700 santa-list empty:santa-hidden"]'
+    )
+    SKILL_ITEM_SELECTOR = soupsieve.compile("p, li")
+    LOCATION_SELECTOR = soupsieve.compile(
+        'lib-resume-main-info p[class="santa-typo-regular santa-text-black-700"]'
+    )
+    SALARY_SELECTOR = soupsieve.compile(
+        'lib-resume-main-info p[class="santa-flex santa-items-center santa-mb-10"] '
+        'span[class="santa-typo-regular santa-text-black-700"]'
+    )
+
+    # The main info block holds the location and salary, and renders last.
+    RESUME_READY_LOCATOR = (By.TAG_NAME, "lib-resume-main-info")
+
+    DEFAULT_PARALLELISM = 3
+
     @staticmethod
     def fetch_resumes(
-        position, location=None, keywords=None, experience=None, salary=None, limit=None
+        position,
+        location=None,
+        keywords=None,
+        experience=None,
+        salary=None,
+        limit=None,
+        max_pages=None,
+        max_details=None,
+        use_cache=True,
+        parallelism=DEFAULT_PARALLELISM,
+        backend="browser",
+        ranking=FIELD_RANKING,
     ):
         """
         Fetches resumes from Robota.ua based on the given position, location, keywords and limit.
 
+        Resume pages of each result page are loaded in parallel by up to `parallelism`
+        browsers from the browser pool, taking only the browsers that are free, and
+        parsed on the parse process pool as they arrive.
+
+        With a `limit`, only the best `limit` resumes are kept while crawling: resume
+        pages are opened only for result cards that could still outrank them, and
+        the crawl stops as soon as no resume at all could.
+
         Args:
             position (str): The job position to search for.
             location (str, optional): The location to search in. Defaults to None.
@@ -60,67 +95,345 @@ class RobotaUAParser:
             experience (int, optional): The experience to search for. Defaults to None.
             salary (int, optional): The salary to search for. Defaults to None.
             limit (int, optional): The maximum number of resumes to return. Defaults to None.
+            max_pages (int, optional): Maximum result pages to crawl. Defaults to None.
+            max_details (int, optional): Maximum resume pages to open. Defaults to None.
+            use_cache (bool, optional): Reuse resumes from the resume cache. Defaults to True.
+            parallelism (int, optional): Maximum browsers loading resume pages at once.
+            backend (str, optional): "browser" to render the site in Chrome, or "api" to
+                read its JSON API over plain HTTP. Defaults to "browser".
+            ranking (str, optional): FIELD_RANKING, or BM25_RANKING to rank by BM25 once
+                the crawl is over, without pruning it. Defaults to FIELD_RANKING.
 
         Returns:
             list: A list of Resume objects.
 
         """
+        if backend == "api":
+            return asyncio.run(
+                RobotaUAApiParser.fetch_resumes_async(
+                    position,
+                    location,
+                    keywords,
+                    experience,
+                    salary,
+                    limit,
+                    max_pages,
+                    max_details,
+                    use_cache,
+                    ranking=ranking,
+                )
+            )
+        if backend != "browser":
+            raise ValueError(f"Unknown robota.ua backend: {backend}")
+
+        top_k = TopK(limit, keywords) if limit and ranking == FIELD_RANKING else None
+        resumes = []
+
         try:
-            driver = WebDriverConfig.get_driver()
+            for resume in deduplicate(
+                RobotaUAParser.iter_resumes(
+                    position,
+                    location,
+                    experience,
+                    salary,
+                    top_k,
+                    max_pages,
+                    max_details,
+                    use_cache,
+                    parallelism,
+                )
+            ):
+                if top_k:
+                    top_k.push(resume)
+                else:
+                    resumes.append(resume)
+
+        except Exception as e:
+            print(f"Error fetching resumes: {e}")
+
+        if top_k:
+            return top_k.results()
+        return sort_resumes_by_relevance(resumes, keywords or [], limit, ranking)
+
+    @staticmethod
+    async def aiter_resumes(
+        position,
+        location=None,
+        experience=None,
+        salary=None,
+        top_k=None,
+        max_pages=None,
+        max_details=None,
+        use_cache=True,
+        parallelism=DEFAULT_PARALLELISM,
+        backend="browser",
+        executor=None,
+        progress=None,
+        incremental=False,
+    ):
+        """
+        Yields resumes from Robota.ua as soon as they are parsed, without blocking the
+        event loop. Takes the same arguments as `iter_resumes`.
+
+        The browser backend crawls on a thread of `executor` (the event loop's default
+        executor if None); the API backend runs on the event loop itself.
+        """
+        if backend == "api":
+            stream = RobotaUAApiParser.aiter_resumes(
+                position,
+                location,
+                experience,
+                salary,
+                top_k,
+                max_pages,
+                max_details,
+                use_cache,
+                progress=progress,
+                incremental=incremental,
+            )
+        elif backend == "browser":
+            stream = iterate_in_thread(
+                lambda: RobotaUAParser.iter_resumes(
+                    position,
+                    location,
+                    experience,
+                    salary,
+                    top_k,
+                    max_pages,
+                    max_details,
+                    use_cache,
+                    parallelism,
+                    progress,
+                    incremental,
+                ),
+                executor,
+            )
+        else:
+            raise ValueError(f"Unknown robota.ua backend: {backend}")
+
+        async with aclosing(stream):
+            async for resume in stream:
+                yield resume
+
+    @staticmethod
+    def iter_resumes(
+        position,
+        location=None,
+        experience=None,
+        salary=None,
+        top_k=None,
+        max_pages=None,
+        max_details=None,
+        use_cache=True,
+        parallelism=DEFAULT_PARALLELISM,
+        progress=None,
+        incremental=False,
+    ):
+        """
+        Yields resumes from Robota.ua as soon as they are parsed, in no particular order.
+
+        The browsers stay leased until the generator is exhausted or closed. An
+        incremental crawl stops as in `WorkUAParser.aiter_resumes`.
+
+        Args:
+            position (str): The job position to search for.
+            location (str, optional): The location to search in. Defaults to None.
+            experience (int, optional): The experience to search for. Defaults to None.
+            salary (int, optional): The salary to search for. Defaults to None.
+            top_k (TopK, optional): The caller's running top K, fed with the yielded
+                resumes. Resume pages are then only opened for cards that could still
+                enter it, and crawling stops once no resume could. Defaults to None.
+            max_pages (int, optional): Maximum result pages to crawl. Defaults to None.
+            max_details (int, optional): Maximum resume pages to open. Defaults to None.
+            use_cache (bool, optional): Reuse resumes from the resume cache. Defaults to True.
+            parallelism (int, optional): Maximum browsers loading resume pages at once.
+            progress (CrawlProgress, optional): Updated with the pages scanned and resume
+                pages fetched so far. Defaults to None.
+            incremental (bool, optional): Crawl only the results that are new since the
+                last incremental crawl of the search. Defaults to False.
+
+        Yields:
+            Resume: The parsed resumes.
+        """
+        cache = get_resume_cache() if use_cache else None
+        best_possible_score = top_k.query.max_score if top_k else None
+        crawl = (
+            IncrementalCrawl(
+                RobotaUAParser.SITE,
+                RobotaUAParser.query_key(position, location, experience, salary),
+            )
+            if incremental
+            else None
+        )
+
+        with get_browser_pool().lease_many(parallelism) as drivers, ThreadPoolExecutor(
+            max_workers=len(drivers)
+        ) as executor:
             page = 1
-            resumes = []
+            details_fetched = 0
 
             while True:
                 url = RobotaUAParser._build_robota_ua_url(
                     position, location, page, experience, salary
                 )
-                driver.get(url)
+                drivers[0].get(url)
 
-                WebDriverWait(driver, 10).until(
+                WebDriverWait(drivers[0], 10).until(
                     EC.presence_of_element_located(
                         (By.CLASS_NAME, "santa-no-underline")
                     )
                 )
 
-                page_content = driver.page_source
-                soup = BeautifulSoup(page_content, "html.parser")
+                page_content = drivers[0].page_source
+                soup = make_soup(page_content)
+                if progress is not None:
+                    progress.pages_scanned += 1
 
-                resume_links = RobotaUAParser._extract_resume_links(soup)
-                if not resume_links:
+                cards = RobotaUAParser._extract_resume_cards(soup)
+                if not cards:
+                    if crawl is not None:
+                        crawl.finish()
                     break
+                caught_up = crawl is not None and crawl.caught_up(
+                    RobotaUAParser._resume_id(card.link) for card in cards
+                )
 
-                for link in resume_links:
-                    resume_url = RobotaUAParser._build_resume_url(link)
-                    driver.get(resume_url)
-                    WebDriverWait(driver, 10).until(
-                        EC.presence_of_element_located(
-                            (By.CLASS_NAME, "santa-typo-regular")
-                        )
+                if top_k:
+                    cards = [
+                        card
+                        for card in cards
+                        if top_k.can_improve(top_k.query.upper_bound(card))
+                    ]
+
+                cached = (
+                    cache.lookup_many(
+                        RobotaUAParser.SITE,
+                        [RobotaUAParser._resume_id(card.link) for card in cards],
                     )
-
-                    resume_page_content = driver.page_source
-                    resume_soup = BeautifulSoup(resume_page_content, "html.parser")
-                    resume = RobotaUAParser.parse_resume(resume_soup, resume_url)
-                    if resume:
-                        resumes.append(resume)
+                    if cache
+                    else [None] * len(cards)
+                )
+                missing = []
+                for i, entry in enumerate(cached):
+                    if entry and entry.fresh:
+                        yield entry.resume
                     else:
-                        print(f"Failed to parse resume at URL: {resume_url}")
-
-                if not RobotaUAParser._has_next_page(soup):
+                        missing.append(i)
+                skipped = []
+                if max_details is not None:
+                    skipped = missing[max_details - details_fetched :]
+                    missing = missing[: max_details - details_fetched]
+
+                resume_urls = [cards[i].link for i in missing]
+                resume_pages = RobotaUAParser._load_resume_pages(
+                    drivers, executor, resume_urls
+                )
+                details_fetched += len(resume_urls)
+                if progress is not None:
+                    progress.details_fetched += len(resume_urls)
+
+                parse_pool = get_parse_pool()
+                parse_futures, content_hashes, revalidated_ids = {}, {}, []
+                failed = set()
+                for i, resume_url, resume_page_content in zip(
+                    missing, resume_urls, resume_pages
+                ):
+                    if resume_page_content is None:
+                        failed.add(i)
+                        # Better a stale resume than none; it stays expired in the cache.
+                        if cached[i]:
+                            yield cached[i].resume
+                        continue
+
+                    resume_id = RobotaUAParser._resume_id(resume_url)
+                    content_hash = PageValidators.hash_content(resume_page_content)
+                    if cached[i] and content_hash == cached[i].validators.content_hash:
+                        revalidated_ids.append(resume_id)
+                        yield cached[i].resume
+                        continue
+
+                    content_hashes[i] = content_hash
+                    parse_futures[
+                        parse_pool.submit(
+                            RobotaUAParser.parse_resume_page,
+                            resume_page_content,
+                            resume_url,
+                        )
+                    ] = i
+
+                parsed_resumes = []
+                for parse_future in as_completed(parse_futures):
+                    i = parse_futures[parse_future]
+                    resume = parse_future.result()
+                    if not resume:
+                        print(f"Failed to parse resume at URL: {cards[i].link}")
+                        continue
+
+                    validators = PageValidators(content_hash=content_hashes[i])
+                    parsed_resumes.append(
+                        (RobotaUAParser._resume_id(cards[i].link), resume, validators)
+                    )
+                    yield resume
+
+                if cache:
+                    cache.put_many(RobotaUAParser.SITE, parsed_resumes)
+                    cache.touch_many(RobotaUAParser.SITE, revalidated_ids)
+
+                if crawl is not None:
+                    # Resumes left unopened are not marked, so the next crawl gets them.
+                    unresolved = failed.union(skipped)
+                    crawl.record(
+                        RobotaUAParser._resume_id(card.link)
+                        for i, card in enumerate(cards)
+                        if i not in unresolved
+                    )
+                    if caught_up:
+                        if cache:
+                            yield from crawl.stored_resumes(cache)
+                        crawl.finish()
+                        break
+
+                if not RobotaUAParser._has_next_page(soup) or (
+                    max_pages is not None and page >= max_pages
+                ):
+                    if crawl is not None:
+                        crawl.finish()
+                    break
+                if max_details is not None and details_fetched >= max_details:
+                    break
+                if top_k and not top_k.can_improve(best_possible_score):
                     break
 
                 page += 1
 
-            sorted_resumes = sort_resumes_by_relevance(resumes, keywords)
-            if limit:
-                sorted_resumes = sorted_resumes[:limit]
+    @staticmethod
+    def _load_resume_pages(drivers, executor, urls):
+        """
+        Loads resume pages in parallel, one page per browser at a time.
+
+        Returns:
+            Iterator: The rendered HTML of each page, in the order of `urls`, yielded
+            as soon as it is loaded, or None for a page that failed to load.
+        """
+        free_drivers = queue.Queue()
+        for driver in drivers:
+            free_drivers.put(driver)
 
-            driver.quit()
-            return sorted_resumes
+        def load(url):
+            driver = free_drivers.get()
+            try:
+                driver.get(url)
+                WebDriverWait(driver, 10).until(
+                    EC.presence_of_element_located(RobotaUAParser.RESUME_READY_LOCATOR)
+                )
+                return driver.page_source
+            except WebDriverException as e:
+                print(f"Error loading resume at URL {url}: {e.msg or e}")
+                return None
+            finally:
+                free_drivers.put(driver)
 
-        except Exception as e:
-            print(f"Error fetching resumes: {e}")
-            return []
+        return executor.map(load, urls)
 
     @staticmethod
     def _has_next_page(soup):
@@ -134,6 +447,21 @@ class RobotaUAParser:
                 return True
         return False
 
+    @staticmethod
+    def query_key(position, location=None, experience=None, salary=None):
+        """
+        Identifies a search by the URL of its first result page, built from the
+        criteria with case and spacing normalized, so that the same search typed
+        differently gets the same key.
+        """
+        return RobotaUAParser._build_robota_ua_url(
+            " ".join(position.lower().split()),
+            location and location.strip().lower(),
+            1,
+            experience,
+            salary,
+        )
+
     @staticmethod
     def _build_robota_ua_url(position, location, page, experience, salary):
         """
@@ -172,18 +500,51 @@ class RobotaUAParser:
         return url
 
     @staticmethod
-    def _extract_resume_links(soup):
-        return [
-            link.get("href")
-            for link in soup.find_all("a", class_="santa-no-underline")
-            if link.get("href") and link.get("href").startswith("/candidates/")
-        ]
+    def _extract_resume_cards(soup):
+        """
+        Builds partial resumes from the result cards of a search page.
+
+        A card shows the city and the expected salary along with a snippet of the
+        resume, which is kept as its description; the remaining attributes are
+        left as None until the resume page is parsed.
+        """
+        cards = []
+        for link in soup.find_all("a", class_="santa-no-underline"):
+            href = link.get("href")
+            if not href or not href.startswith("/candidates/"):
+                continue
+
+            text = link.get_text(" ", strip=True)
+            salary_match = RobotaUAParser.CARD_SALARY_PATTERN.search(text)
+            cards.append(
+                Resume.parse(
+                    None,
+                    location=find_city(text),
+                    salary=salary_match.group(0) if salary_match else None,
+                    link=RobotaUAParser._build_resume_url(href),
+                    partial=True,
+                    description=text,
+                )
+            )
+
+        return cards
 
     @staticmethod
     def _build_resume_url(link):
         resume_id = link.split("/")[-1]
         return f"{RobotaUAParser.BASE_URL}/{resume_id}/"
 
+    @staticmethod
+    def _resume_id(link):
+        return link.rstrip("/").split("/")[-1]
+
+    @staticmethod
+    def parse_resume_page(content, link):
+        """
+        Parses a resume from the rendered HTML of its page. Runs on the parse pool.
+        """
+        return RobotaUAParser.parse_resume(make_soup(content, RESUME_BODY), link)
+
     @staticmethod
     def parse_resume(soup, link):
         """
@@ -196,7 +557,9 @@ class RobotaUAParser:
             location = RobotaUAParser._extract_location(soup)
             salary = RobotaUAParser._extract_salary(soup)
 
-            return Resume(job_position, experience, skills, location, salary, link)
+            return Resume.parse(
+                job_position, experience, skills, location, salary, link
+            )
 
         except Exception as e:
             print(f"Error parsing individual resume: {e}")
@@ -207,9 +570,7 @@ class RobotaUAParser:
         """
         Extracts the job position from the resume.
         """
-        position_tag = soup.find(
-            "p", class_="santa-mt-10 santa-typo-secondary santa-text-black-700"
-        )
+        position_tag = RobotaUAParser.POSITION_SELECTOR.select_one(soup)
         return position_tag.get_text(strip=True) if position_tag else "Unknown"
 
     @staticmethod
@@ -217,10 +578,7 @@ class RobotaUAParser:
         """
         Extracts the work experience from the resume.
         """
-        experience_tag = soup.find(
-            "span",
-            class_="santa-text-red-500 santa-whitespace-nowrap",
-        )
+        experience_tag = RobotaUAParser.EXPERIENCE_SELECTOR.select_one(soup)
         return experience_tag.get_text(strip=True) if experience_tag else "Unknown"
 
     @staticmethod
@@ -228,14 +586,11 @@ class RobotaUAParser:
         """
         Extracts the skills from the resume.
         """
-        skills_tag = soup.find(
-            "div",
-            class_="santa-m-0 santa-mb-20 760:santa-mb-40 last:santa-mb-0 santa-typo-regular santa-text-black-700 santa-list empty:santa-hidden",
-        )
+        skills_tag = RobotaUAParser.SKILLS_SELECTOR.select_one(soup)
         if not skills_tag:
             return "Unknown"
 
-        skill_elements = skills_tag.find_all(["p", "li"])
+        skill_elements = RobotaUAParser.SKILL_ITEM_SELECTOR.select(skills_tag)
 
         if skill_elements:
             skills = [skill.get_text(strip=True) for skill in skill_elements]
@@ -249,31 +604,13 @@ class RobotaUAParser:
         """
         Extracts the location from the resume.
         """
-        location_info = soup.find("lib-resume-main-info")
-        if location_info:
-            location_tag = location_info.find(
-                "p", class_="santa-typo-regular santa-text-black-700"
-            )
-            return location_tag.get_text(strip=True)
-        else:
-            return "Unknown"
+        location_tag = RobotaUAParser.LOCATION_SELECTOR.select_one(soup)
+        return location_tag.get_text(strip=True) if location_tag else "Unknown"
 
     @staticmethod
     def _extract_salary(soup):
         """
         Extracts the salary from the resume.
         """
-        resume_main_info_tag = soup.find("lib-resume-main-info")
-        if resume_main_info_tag:
-            salary_info = resume_main_info_tag.find(
-                "p", class_="santa-flex santa-items-center santa-mb-10"
-            )
-            if salary_info:
-                salary_tag = salary_info.find(
-                    "span", class_="santa-typo-regular santa-text-black-700"
-                )
-                return salary_tag.get_text(strip=True) if salary_tag else "Unknown"
-            else:
-                return "Unknown"
-        else:
-            return "Unknown"
+        salary_tag = RobotaUAParser.SALARY_SELECTOR.select_one(soup)
+        return salary_tag.get_text(strip=True) if salary_tag else "Unknown"
@@ -0,0 +1,27 @@
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+
+    PARSER = "lxml"
+except ImportError:
+    PARSER = "html.parser"
+
+# Resume pages are only parsed from <body>: their <head> is mostly inline scripts
+# and metadata that the extractors never look at.
+RESUME_BODY = SoupStrainer("body")
+
+
+def make_soup(markup, parse_only=None):
+    """
+    Builds a BeautifulSoup tree with the fastest available tree builder.
+
+    Args:
+        markup (str | bytes): The HTML to parse.
+        parse_only (SoupStrainer, optional): Builds only the matching part of the
+            document. Defaults to None.
+
+    Returns:
+        BeautifulSoup: The parsed document.
+    """
+    return BeautifulSoup(markup, PARSER, parse_only=parse_only)
@@ -0,0 +1,152 @@
+import asyncio
+import threading
+from dataclasses import dataclass
+
+
+@dataclass
+class CrawlProgress:
+    """
+    Counters a streaming crawl updates as it goes, so callers can report progress.
+    """
+
+    pages_scanned: int = 0
+    details_fetched: int = 0
+
+
+def iterate_blocking(async_iterator):
+    """
+    Iterates an async iterator from synchronous code, driving it on a private event loop.
+
+    Args:
+        async_iterator (AsyncIterator): The iterator to drain.
+
+    Yields:
+        The items of `async_iterator`.
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(async_iterator.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        loop.run_until_complete(async_iterator.aclose())
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+
+async def iterate_in_thread(iterator_factory, executor=None):
+    """
+    Runs a blocking iterator on a worker thread and yields its items asynchronously.
+
+    When the caller stops early, the iterator is closed on its thread as soon as
+    it produces its next item.
+
+    Args:
+        iterator_factory (Callable): Creates the iterator; called on the worker thread.
+        executor (Executor, optional): Runs the worker thread. Defaults to the event
+            loop's default executor.
+
+    Yields:
+        The items of the iterator.
+    """
+    loop = asyncio.get_running_loop()
+    items = asyncio.Queue()
+    stopped = threading.Event()
+    finished = object()
+
+    def run():
+        iterator = iterator_factory()
+        try:
+            for item in iterator:
+                loop.call_soon_threadsafe(items.put_nowait, (item, None))
+                if stopped.is_set():
+                    break
+        except BaseException as e:
+            loop.call_soon_threadsafe(items.put_nowait, (finished, e))
+        else:
+            loop.call_soon_threadsafe(items.put_nowait, (finished, None))
+        finally:
+            close = getattr(iterator, "close", None)
+            if close:
+                close()
+
+    worker = loop.run_in_executor(executor, run)
+    try:
+        while True:
+            item, error = await items.get()
+            if error:
+                raise error
+            if item is finished:
+                break
+            yield item
+        await worker
+    finally:
+        stopped.set()
+
+
+async def until_set(async_iterator, event):
+    """
+    Yields the items of an async iterator until `event` is set, even while the
+    iterator is waiting for its next item. The iterator is closed either way.
+
+    Args:
+        async_iterator (AsyncIterator): The iterator to drain.
+        event (asyncio.Event): Stops the iteration once set.
+
+    Yields:
+        The items of `async_iterator`.
+    """
+    stopped = asyncio.ensure_future(event.wait())
+    try:
+        while True:
+            item = asyncio.ensure_future(async_iterator.__anext__())
+            await asyncio.wait({item, stopped}, return_when=asyncio.FIRST_COMPLETED)
+            if not item.done():
+                item.cancel()
+                await asyncio.gather(item, return_exceptions=True)
+                return
+            try:
+                value = item.result()
+            except StopAsyncIteration:
+                return
+            yield value
+    finally:
+        stopped.cancel()
+        await async_iterator.aclose()
+
+
+async def merge(*async_iterators):
+    """
+    Yields the items of several async iterators as soon as any of them produces
+    one, so the merged stream ends when the slowest iterator does. The iterators
+    are closed either way.
+
+    Args:
+        *async_iterators (AsyncIterator): The iterators to merge.
+
+    Yields:
+        The items of all iterators, in the order they are produced.
+    """
+    pending = {
+        asyncio.ensure_future(iterator.__anext__()): iterator
+        for iterator in async_iterators
+    }
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                iterator = pending.pop(future)
+                try:
+                    item = future.result()
+                except StopAsyncIteration:
+                    continue
+                pending[asyncio.ensure_future(iterator.__anext__())] = iterator
+                yield item
+    finally:
+        for future in pending:
+            future.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for iterator in async_iterators:
+            await iterator.aclose()
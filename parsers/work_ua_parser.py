@@ -1,11 +1,23 @@
+import asyncio
 import re
-import requests
-from bs4 import BeautifulSoup
+from contextlib import aclosing
+
+import aiohttp
+import soupsieve
 from data.resume import Resume
-from utils.filters import sort_resumes_by_relevance
+from data.high_water_marks import IncrementalCrawl
+from data.resume_cache import PageValidators, get_resume_cache
+from parsers.crawler import AsyncCrawler
+from parsers.parse_pool import fetch_and_parse
+from parsers.soup import RESUME_BODY, make_soup
+from parsers.streams import iterate_blocking
+from utils.dedup import adeduplicate
+from utils.filters import FIELD_RANKING, TopK, sort_resumes_by_relevance
+from utils.normalize import find_city
 
 
 class WorkUAParser:
+    SITE = "work.ua"
     BASE_URL = "https://www.work.ua/resumes"
 
     EXPERIENCE_MAP = {
@@ -27,12 +39,39 @@ class WorkUAParser:
         "100000": "17",  # up to 100000
     }
 
+    # Thousands are space-separated, so numbers before the salary stay out of it.
+    CARD_SALARY_PATTERN = re.compile(r"(?<!\d)\d+(?:\s\d{3})*\s?(?:грн|\$|€)")
+
+    YEARS_PATTERN = re.compile(r"(\d+)\s*(рік|роки|років)")
+    MONTHS_PATTERN = re.compile(r"(\d+)\s*(місяць|місяці|місяців)")
+
+    POSITION_SELECTOR = soupsieve.compile('h2[class="mt-lg sm:mt-xl"]')
+    EXPERIENCE_HEADER_SELECTOR = soupsieve.compile(
+        'h2:-soup-contains-own("Досвід роботи")'
+    )
+    EXPERIENCE_SELECTOR = soupsieve.compile("span.text-default-7")
+    SKILLS_SELECTOR = soupsieve.compile(
+        'span[class="label label-skill label-gray-100"] span.ellipsis'
+    )
+    LOCATION_SELECTOR = soupsieve.compile(
+        'dt:-soup-contains-own("Місто проживання:") ~ dd'
+    )
+    SALARY_SELECTOR = soupsieve.compile("span.text-muted-print")
+
     @staticmethod
     def fetch_resumes(
-        position, location=None, keywords=None, experience=None, salary=None, limit=None
+        position,
+        location=None,
+        keywords=None,
+        experience=None,
+        salary=None,
+        limit=None,
+        **options,
     ):
         """
-        Fetches resumes from Robota.ua based on the given position, location, keywords and limit.
+        Fetches resumes from Work.ua based on the given position, location, keywords and limit.
+
+        Blocking wrapper around `fetch_resumes_async` for callers without a running event loop.
 
         Args:
             position (str): The job position to search for.
@@ -41,58 +80,270 @@ class WorkUAParser:
             experience (int, optional): The experience to search for. Defaults to None.
             salary (int, optional): The salary to search for. Defaults to None.
             limit (int, optional): The maximum number of resumes to return. Defaults to None.
+            **options: Crawl options passed on to `fetch_resumes_async`.
 
         Returns:
             list: A list of Resume objects.
 
         """
+        return asyncio.run(
+            WorkUAParser.fetch_resumes_async(
+                position, location, keywords, experience, salary, limit, **options
+            )
+        )
+
+    @staticmethod
+    async def fetch_resumes_async(
+        position,
+        location=None,
+        keywords=None,
+        experience=None,
+        salary=None,
+        limit=None,
+        ranking=FIELD_RANKING,
+        **options,
+    ):
+        """
+        Fetches resumes from Work.ua, downloading the detail pages of each result
+        page concurrently over a single pooled connection.
+
+        With a `limit`, only the best `limit` resumes are kept while crawling: resume
+        pages are downloaded only for result cards that could still outrank them, and
+        pagination stops as soon as no resume at all could.
+
+        If the site fails midway, e.g. it keeps rate limiting after every retry, the
+        search stops there and ranks the resumes found so far.
+
+        Args:
+            position (str): The job position to search for.
+            location (str, optional): The location to search in. Defaults to None.
+            keywords (str, optional): The keywords to search for. Defaults to None.
+            experience (int, optional): The experience to search for. Defaults to None.
+            salary (int, optional): The salary to search for. Defaults to None.
+            limit (int, optional): The maximum number of resumes to return. Defaults to None.
+            ranking (str, optional): FIELD_RANKING, or BM25_RANKING to rank by BM25 once
+                the crawl is over, without pruning it. Defaults to FIELD_RANKING.
+            **options: Crawl options passed on to `aiter_resumes`.
+
+        Returns:
+            list: A list of Resume objects.
+        """
+        top_k = TopK(limit, keywords) if limit and ranking == FIELD_RANKING else None
+        resumes = []
+
         try:
-            page = 1
-            resumes = []
+            async for resume in adeduplicate(
+                WorkUAParser.aiter_resumes(
+                    position, location, experience, salary, top_k=top_k, **options
+                )
+            ):
+                if top_k:
+                    top_k.push(resume)
+                else:
+                    resumes.append(resume)
 
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Error fetching resumes: {e}")
+
+        except Exception as e:
+            print(f"Error parsing resumes: {e}")
+
+        if top_k:
+            return top_k.results()
+        return sort_resumes_by_relevance(resumes, keywords or [], limit, ranking)
+
+    @staticmethod
+    def iter_resumes(position, location=None, experience=None, salary=None, **options):
+        """
+        Yields resumes from Work.ua as soon as they are parsed.
+
+        Blocking counterpart of `aiter_resumes` for callers without a running event loop.
+        """
+        return iterate_blocking(
+            WorkUAParser.aiter_resumes(
+                position, location, experience, salary, **options
+            )
+        )
+
+    @staticmethod
+    async def aiter_resumes(
+        position,
+        location=None,
+        experience=None,
+        salary=None,
+        top_k=None,
+        max_pages=None,
+        max_details=None,
+        use_cache=True,
+        concurrency=AsyncCrawler.DEFAULT_CONCURRENCY_PER_HOST,
+        requests_per_second=AsyncCrawler.DEFAULT_REQUESTS_PER_SECOND,
+        progress=None,
+        incremental=False,
+    ):
+        """
+        Yields resumes from Work.ua as soon as they are parsed, in no particular order.
+
+        Detail pages are downloaded concurrently and parsed on the parse process pool.
+        Cached resumes are reused; expired ones are revalidated with conditional
+        requests and only re-parsed if their page changed.
+
+        An incremental crawl stops at the first result page whose resumes were all
+        found by earlier incremental crawls of the search, and yields the cached
+        resumes of the later pages instead of crawling them.
+
+        Args:
+            position (str): The job position to search for.
+            location (str, optional): The location to search in. Defaults to None.
+            experience (int, optional): The experience to search for. Defaults to None.
+            salary (int, optional): The salary to search for. Defaults to None.
+            top_k (TopK, optional): The caller's running top K, fed with the yielded
+                resumes. Resume pages are then only downloaded for cards that could
+                still enter it, and crawling stops once no resume could. Defaults to None.
+            max_pages (int, optional): Maximum result pages to crawl. Defaults to None.
+            max_details (int, optional): Maximum resume pages to download. Defaults to None.
+            use_cache (bool, optional): Reuse resumes from the resume cache. Defaults to True.
+            concurrency (int, optional): Maximum simultaneous requests to work.ua.
+            requests_per_second (float, optional): Politeness rate limit for work.ua.
+            progress (CrawlProgress, optional): Updated with the pages scanned and resume
+                pages fetched so far. Defaults to None.
+            incremental (bool, optional): Crawl only the results that are new since the
+                last incremental crawl of the search. Defaults to False.
+
+        Yields:
+            Resume: The parsed resumes.
+        """
+        cache = get_resume_cache() if use_cache else None
+        best_possible_score = top_k.query.max_score if top_k else None
+        crawl = (
+            IncrementalCrawl(
+                WorkUAParser.SITE,
+                WorkUAParser.query_key(position, location, experience, salary),
+            )
+            if incremental
+            else None
+        )
+        page = 1
+        details_fetched = 0
+
+        async with AsyncCrawler(concurrency, requests_per_second) as crawler:
             while True:
                 url = WorkUAParser._build_work_ua_url(
                     position, location, experience, salary, page
                 )
-                response = requests.get(url)
-                response.raise_for_status()
+                content = await crawler.fetch(url)
 
-                soup = BeautifulSoup(response.content, "html.parser")
-                resume_ids = WorkUAParser._extract_resume_ids(soup)
-                if not resume_ids:
-                    break
+                soup = make_soup(content)
+                if progress is not None:
+                    progress.pages_scanned += 1
 
-                for resume_id in resume_ids:
-                    resume_url = f"{WorkUAParser.BASE_URL}/{resume_id}/"
-                    resume_response = requests.get(resume_url)
-                    resume_response.raise_for_status()
+                cards = WorkUAParser._extract_resume_cards(soup)
+                if not cards:
+                    if crawl is not None:
+                        crawl.finish()
+                    break
+                caught_up = crawl is not None and crawl.caught_up(
+                    WorkUAParser._resume_id(card.link) for card in cards
+                )
 
-                    resume_soup = BeautifulSoup(resume_response.content, "html.parser")
-                    resume = WorkUAParser.parse_resume(resume_soup, resume_url)
-                    if resume:
-                        resumes.append(resume)
+                if top_k:
+                    cards = [
+                        card
+                        for card in cards
+                        if top_k.can_improve(top_k.query.upper_bound(card))
+                    ]
+
+                cached = (
+                    cache.lookup_many(
+                        WorkUAParser.SITE,
+                        [WorkUAParser._resume_id(card.link) for card in cards],
+                    )
+                    if cache
+                    else [None] * len(cards)
+                )
+                missing = []
+                for i, entry in enumerate(cached):
+                    if entry and entry.fresh:
+                        yield entry.resume
                     else:
-                        print(f"Failed to parse resume at URL: {resume_url}")
-
-                if not WorkUAParser._has_next_page(soup):
+                        missing.append(i)
+                skipped = []
+                if max_details is not None:
+                    skipped = missing[max_details - details_fetched :]
+                    missing = missing[: max_details - details_fetched]
+
+                fetched_validators, parsed_resumes, failed = {}, [], set()
+                async with aclosing(
+                    fetch_and_parse(
+                        [
+                            WorkUAParser._fetch_resume_page(
+                                crawler,
+                                i,
+                                cards[i].link,
+                                cached[i],
+                                fetched_validators,
+                                failed,
+                            )
+                            for i in missing
+                        ],
+                        WorkUAParser.parse_resume_page,
+                    )
+                ) as parsed:
+                    async for i, resume in parsed:
+                        if not resume:
+                            print(f"Failed to parse resume at URL: {cards[i].link}")
+                            continue
+
+                        resume_id = WorkUAParser._resume_id(cards[i].link)
+                        parsed_resumes.append(
+                            (resume_id, resume, fetched_validators[i])
+                        )
+                        yield resume
+                details_fetched += len(missing)
+                if progress is not None:
+                    progress.details_fetched += len(missing)
+
+                revalidated_ids = []
+                for i in missing:
+                    if i in failed:
+                        # Better a stale resume than none; it stays expired in the cache.
+                        if cached[i]:
+                            yield cached[i].resume
+                    elif i not in fetched_validators:
+                        revalidated_ids.append(WorkUAParser._resume_id(cards[i].link))
+                        yield cached[i].resume
+
+                if cache:
+                    cache.put_many(WorkUAParser.SITE, parsed_resumes)
+                    cache.touch_many(WorkUAParser.SITE, revalidated_ids)
+
+                if crawl is not None:
+                    # Resumes left unfetched are not marked, so the next crawl gets them.
+                    unresolved = failed.union(skipped)
+                    crawl.record(
+                        WorkUAParser._resume_id(card.link)
+                        for i, card in enumerate(cards)
+                        if i not in unresolved
+                    )
+                    if caught_up:
+                        if cache:
+                            for resume in crawl.stored_resumes(cache):
+                                yield resume
+                        crawl.finish()
+                        break
+
+                if not WorkUAParser._has_next_page(soup) or (
+                    max_pages is not None and page >= max_pages
+                ):
+                    if crawl is not None:
+                        crawl.finish()
+                    break
+                if max_details is not None and details_fetched >= max_details:
+                    break
+                if top_k and not top_k.can_improve(best_possible_score):
                     break
 
                 page += 1
 
-            sorted_resumes = sort_resumes_by_relevance(resumes, keywords)
-            if limit:
-                sorted_resumes = sorted_resumes[:limit]
-
-            return sorted_resumes
-
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching resumes: {e}")
-            return []
-
-        except Exception as e:
-            print(f"Error parsing resumes: {e}")
-            return []
-
     @staticmethod
     def _has_next_page(soup):
         """
@@ -103,6 +354,21 @@ class WorkUAParser:
             return True
         return False
 
+    @staticmethod
+    def query_key(position, location=None, experience=None, salary=None):
+        """
+        Identifies a search by the URL of its first result page, built from the
+        criteria with case and spacing normalized, so that the same search typed
+        differently gets the same key.
+        """
+        return WorkUAParser._build_work_ua_url(
+            " ".join(position.lower().split()),
+            location and location.strip().lower(),
+            experience,
+            salary,
+            1,
+        )
+
     @staticmethod
     def _build_work_ua_url(position, location, experience, salary, page):
         """
@@ -138,10 +404,90 @@ class WorkUAParser:
         return url
 
     @staticmethod
-    def _extract_resume_ids(soup):
-        return [
-            a_tag["name"] for a_tag in soup.select("a[name]") if a_tag["name"].isdigit()
-        ]
+    def _extract_resume_cards(soup):
+        """
+        Builds partial resumes from the result cards of a search page.
+
+        A card shows the job position, the city and the expected salary along with
+        a snippet of the resume, which is kept as its description; the remaining
+        attributes are left as None until the resume page is parsed.
+        """
+        cards = []
+        for a_tag in soup.select("a[name]"):
+            resume_id = a_tag["name"]
+            if not resume_id.isdigit():
+                continue
+
+            card = a_tag.find_parent("div", class_="card")
+            position, location, salary, text = None, None, None, None
+            if card:
+                title_tag = card.find("h2")
+                if title_tag and title_tag.get_text(strip=True):
+                    position = title_tag.get_text(strip=True)
+                text = card.get_text(" ", strip=True)
+                location = find_city(text)
+                salary_match = WorkUAParser.CARD_SALARY_PATTERN.search(text)
+                salary = salary_match.group(0) if salary_match else "Unknown"
+
+            cards.append(
+                Resume.parse(
+                    position,
+                    location=location,
+                    salary=salary,
+                    link=f"{WorkUAParser.BASE_URL}/{resume_id}/",
+                    partial=True,
+                    description=text,
+                )
+            )
+
+        return cards
+
+    @staticmethod
+    def _resume_id(link):
+        return link.rstrip("/").split("/")[-1]
+
+    @staticmethod
+    async def _fetch_resume_page(
+        crawler, key, link, cached, validators_out, failed_out
+    ):
+        """
+        Fetches a resume page for `fetch_and_parse`, revalidating the cached resume if any.
+
+        Returns None if the cached resume is still current, or if the page could not
+        be fetched, in which case the key is added to `failed_out`. Otherwise stores
+        the page validators in `validators_out[key]` and returns the key and parse
+        arguments.
+        """
+        validators = cached.validators if cached else PageValidators()
+        try:
+            resume_page = await crawler.fetch_page(
+                link, validators.etag, validators.last_modified
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Error fetching resume at URL {link}: {e}")
+            failed_out.add(key)
+            return None
+        content_hash = (
+            None
+            if resume_page.not_modified
+            else PageValidators.hash_content(resume_page.body)
+        )
+        if cached and (
+            resume_page.not_modified or content_hash == validators.content_hash
+        ):
+            return None
+
+        validators_out[key] = PageValidators(
+            resume_page.etag, resume_page.last_modified, content_hash
+        )
+        return key, (resume_page.body, link)
+
+    @staticmethod
+    def parse_resume_page(content, link):
+        """
+        Parses a resume from the raw HTML of its page. Runs on the parse pool.
+        """
+        return WorkUAParser.parse_resume(make_soup(content, RESUME_BODY), link)
 
     @staticmethod
     def parse_resume(soup, link):
@@ -155,7 +501,9 @@ class WorkUAParser:
             location = WorkUAParser._extract_location(soup)
             salary = WorkUAParser._extract_salary(soup)
 
-            return Resume(job_position, experience, skills, location, salary, link)
+            return Resume.parse(
+                job_position, experience, skills, location, salary, link
+            )
 
         except Exception as e:
             print(f"Error parsing individual resume: {e}")
@@ -166,7 +514,7 @@ class WorkUAParser:
         """
         Extracts the job position from the resume.
         """
-        position_tag = soup.find("h2", class_="mt-lg sm:mt-xl")
+        position_tag = WorkUAParser.POSITION_SELECTOR.select_one(soup)
         return position_tag.get_text(strip=True) if position_tag else "Unknown"
 
     @staticmethod
@@ -174,7 +522,7 @@ class WorkUAParser:
         """
         Extracts the work experience from the resume.
         """
-        experience_field = soup.find("h2", text="Досвід роботи")
+        experience_field = WorkUAParser.EXPERIENCE_HEADER_SELECTOR.select_one(soup)
         if not experience_field:
             return "0 years, 0 months"
 
@@ -182,15 +530,13 @@ class WorkUAParser:
         for sibling in experience_field.find_next_siblings():
             if sibling.name == "h2" and sibling.get_text(strip=True) == "Освіта":
                 break
-            experience_tags.extend(sibling.find_all("span", class_="text-default-7"))
+            experience_tags.extend(WorkUAParser.EXPERIENCE_SELECTOR.select(sibling))
 
         total_experience_years, total_experience_months = 0, 0
         for tag in experience_tags:
             experience_text = tag.get_text(strip=True)
-            years_match = re.search(r"(\d+)\s*(рік|роки|років)", experience_text)
-            months_match = re.search(
-                r"(\d+)\s*(місяць|місяці|місяців)", experience_text
-            )
+            years_match = WorkUAParser.YEARS_PATTERN.search(experience_text)
+            months_match = WorkUAParser.MONTHS_PATTERN.search(experience_text)
 
             if years_match:
                 total_experience_years += int(years_match.group(1))
@@ -204,10 +550,9 @@ class WorkUAParser:
     @staticmethod
     def _extract_skills(soup):
 
-        skills_tags = soup.find_all("span", class_="label label-skill label-gray-100")
         skills = [
-            tag.find("span", class_="ellipsis").get_text(strip=True).lower()
-            for tag in skills_tags
+            tag.get_text(strip=True).lower()
+            for tag in WorkUAParser.SKILLS_SELECTOR.select(soup)
         ]
 
         return ", ".join(skills)
@@ -217,17 +562,13 @@ class WorkUAParser:
         """
         Extracts the location from the resume.
         """
-        location_tag = soup.find("dt", text="Місто проживання:")
-        return (
-            location_tag.find_next_sibling("dd").get_text(strip=True)
-            if location_tag
-            else "Unknown"
-        )
+        location_tag = WorkUAParser.LOCATION_SELECTOR.select_one(soup)
+        return location_tag.get_text(strip=True) if location_tag else "Unknown"
 
     @staticmethod
     def _extract_salary(soup):
         """
         Extracts the salary from the resume.
         """
-        salary_tag = soup.find("span", class_="text-muted-print")
+        salary_tag = WorkUAParser.SALARY_SELECTOR.select_one(soup)
         return salary_tag.get_text(strip=True)[2:] if salary_tag else "Unknown"
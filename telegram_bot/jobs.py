@@ -0,0 +1,113 @@
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlJobs:
+    """
+    Runs resume searches in the background so handlers return immediately.
+
+    At most `max_workers` searches run at once; further searches wait for a free
+    slot. Blocking parsers are offloaded to a thread pool of the same size, and
+    every user can have a single search in flight.
+
+    Besides being cancelled, a search can be asked to stop: it then finishes
+    early on its own and still reports what it found so far.
+    """
+
+    MAX_WORKERS = 4
+
+    def __init__(self, max_workers=MAX_WORKERS):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="crawl"
+        )
+        self._slots = asyncio.Semaphore(max_workers)
+        self._jobs = {}
+        self._stop_events = {}
+
+    @property
+    def executor(self):
+        """
+        The thread pool that runs blocking parsers.
+        """
+        return self._executor
+
+    @property
+    def running(self):
+        """
+        The number of searches in flight, including those waiting for a slot.
+        """
+        return sum(not job.done() for job in self._jobs.values())
+
+    def is_running(self, user_id):
+        """
+        Checks whether the user already has a search in flight.
+        """
+        job = self._jobs.get(user_id)
+        return job is not None and not job.done()
+
+    def start(self, user_id, coroutine):
+        """
+        Schedules `coroutine` as the user's search job.
+
+        Args:
+            user_id (int): Telegram id of the user who requested the search.
+            coroutine (Coroutine): The search to run once a worker slot is free.
+
+        Returns:
+            asyncio.Task: The scheduled job.
+        """
+        job = asyncio.create_task(self._run(coroutine))
+        self._jobs[user_id] = job
+        self._stop_events[user_id] = asyncio.Event()
+        job.add_done_callback(functools.partial(self._forget, user_id))
+        # Closes the search if the job is cancelled before it starts running.
+        job.add_done_callback(lambda _: coroutine.close())
+        return job
+
+    def cancel(self, user_id):
+        """
+        Cancels the user's search, if any.
+
+        Returns:
+            bool: True if a running search was cancelled.
+        """
+        job = self._jobs.get(user_id)
+        if job is None or job.done():
+            return False
+        return job.cancel()
+
+    def stop_event(self, user_id):
+        """
+        Returns the event set when the user asks their search to stop early.
+        """
+        return self._stop_events.setdefault(user_id, asyncio.Event())
+
+    def stop(self, user_id):
+        """
+        Asks the user's search to stop early and report what it found so far.
+
+        Returns:
+            bool: True if a running search was asked to stop.
+        """
+        if not self.is_running(user_id):
+            return False
+        self.stop_event(user_id).set()
+        return True
+
+    async def _run(self, coroutine):
+        try:
+            async with self._slots:
+                return await coroutine
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Search job failed")
+
+    def _forget(self, user_id, job):
+        if self._jobs.get(user_id) is job:
+            del self._jobs[user_id]
+            self._stop_events.pop(user_id, None)
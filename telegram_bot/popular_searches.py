@@ -0,0 +1,61 @@
+import threading
+import time
+from typing import Hashable, List
+
+
+class PopularSearches:
+    """
+    Keeps count of how often each search is run, so the most popular ones can be
+    crawled ahead of time.
+
+    Counts halve every `half_life` seconds, so searches nobody runs any more fade
+    out, and only the `max_entries` most popular searches are remembered.
+    """
+
+    DEFAULT_HALF_LIFE = 24 * 60 * 60
+    DEFAULT_MAX_ENTRIES = 256
+
+    def __init__(
+        self,
+        half_life: float = DEFAULT_HALF_LIFE,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.half_life = half_life
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._searches = {}
+
+    def record(self, key: Hashable, criteria: dict) -> None:
+        """
+        Counts a run of the search identified by `key`.
+
+        Args:
+            key (Hashable): The normalized criteria of the search.
+            criteria (dict): The criteria to crawl the search again with.
+        """
+        now = time.monotonic()
+        with self._lock:
+            count = self._count(key, now) + 1
+            self._searches[key] = (count, now, dict(criteria))
+            if len(self._searches) > self.max_entries:
+                least_popular = min(
+                    self._searches, key=lambda other: self._count(other, now)
+                )
+                del self._searches[least_popular]
+
+    def top(self, n: int) -> List[dict]:
+        """
+        Returns the criteria of the `n` most popular searches, most popular first.
+        """
+        now = time.monotonic()
+        with self._lock:
+            keys = sorted(
+                self._searches, key=lambda key: self._count(key, now), reverse=True
+            )
+            return [dict(self._searches[key][2]) for key in keys[:n]]
+
+    def _count(self, key, now):
+        if key not in self._searches:
+            return 0.0
+        count, updated, _ = self._searches[key]
+        return count * 0.5 ** ((now - updated) / self.half_life)
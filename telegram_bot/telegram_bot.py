@@ -1,8 +1,33 @@
+import asyncio
+import html
 import logging
-from telegram import Update, ReplyKeyboardMarkup, ReplyKeyboardRemove
+import os
+from concurrent.futures import Future
+from contextlib import aclosing
+from dataclasses import replace
+from telegram import (
+    InlineKeyboardButton,
+    InlineKeyboardMarkup,
+    Message,
+    Update,
+    ReplyKeyboardMarkup,
+    ReplyKeyboardRemove,
+)
+from telegram.error import RetryAfter, TelegramError
 from telegram.ext import CallbackContext, ConversationHandler
+from data.query_cache import get_query_cache
+from data.saved_searches import SavedSearch, SavedSearches, get_saved_searches
+from data.search_index import get_search_index
+from parsers.federated_parser import FederatedParser
 from parsers.robota_ua_parser import RobotaUAParser
+from parsers.streams import CrawlProgress, until_set
 from parsers.work_ua_parser import WorkUAParser
+from telegram_bot.jobs import CrawlJobs
+from telegram_bot.popular_searches import PopularSearches
+from utils.dedup import adeduplicate
+from utils.filters import SharedTopK, TopK
+from utils.normalize import parse_skills
+from utils.scoring import KeywordQuery
 
 logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", level=logging.INFO
@@ -21,17 +46,56 @@ logger = logging.getLogger(__name__)
 
 user_data = {}
 
+crawl_jobs = CrawlJobs()
+
+popular_searches = PopularSearches()
+
+# Result pages crawled per search, and the number of best resumes shown.
+SEARCH_MAX_PAGES = 10
+SEARCH_RESULTS = 5
+
+# Minimum seconds between two progress updates of a running search.
+PROGRESS_UPDATE_INTERVAL = 2
+
+STOP_SEARCH = "stop_search"
+STOP_SEARCH_MARKUP = InlineKeyboardMarkup(
+    [[InlineKeyboardButton("Stop", callback_data=STOP_SEARCH)]]
+)
+
+# "browser" renders robota.ua in Chrome, "api" reads its JSON API.
+ROBOTA_UA_BACKEND = os.environ.get("ROBOTA_UA_BACKEND", "browser")
+
+# Seconds between background re-crawls of the most popular searches (0 disables
+# them), how many searches each one covers, and the most requests it may send.
+PRECRAWL_INTERVAL = float(os.environ.get("PRECRAWL_INTERVAL", 10 * 60))
+PRECRAWL_SEARCHES = int(os.environ.get("PRECRAWL_SEARCHES", 5))
+PRECRAWL_REQUEST_BUDGET = int(os.environ.get("PRECRAWL_REQUEST_BUDGET", 200))
+
+# Seconds between checks of the saved searches for new resumes (0 disables
+# them), the most requests a check may send, the score a new resume needs to be
+# sent, and the most resumes sent to a user at once.
+SAVED_SEARCH_INTERVAL = float(os.environ.get("SAVED_SEARCH_INTERVAL", 60 * 60))
+SAVED_SEARCH_REQUEST_BUDGET = int(os.environ.get("SAVED_SEARCH_REQUEST_BUDGET", 300))
+SAVED_SEARCH_MIN_SCORE = int(os.environ.get("SAVED_SEARCH_MIN_SCORE", 10))
+SAVED_SEARCH_MAX_RESUMES = 10
+MAX_SAVED_SEARCHES = 5
+
+# Seconds between two notifications, well under the Telegram limit of about 30
+# messages per second.
+NOTIFICATION_INTERVAL = 0.1
+
 
 async def start(update: Update, context: CallbackContext) -> int:
     """
     Starts the conversation and asks the user to choose a site.
     """
 
-    reply_keyboard = [["work.ua", "robota.ua"]]
+    reply_keyboard = [["work.ua", "robota.ua"], [FederatedParser.SITE]]
 
     await update.message.reply_text(
         "Welcome to the Resumes Parser Bot!\n\n"
-        "Please choose the site you want to parse resumes from.\n\n"
+        "Please choose the site you want to parse resumes from, "
+        f"or '{FederatedParser.SITE}' to search both at once.\n\n"
         "<i>If nothing happens, please try again</i>",
         parse_mode="HTML",
         reply_markup=ReplyKeyboardMarkup(
@@ -47,9 +111,10 @@ async def select_site(update: Update, context: CallbackContext) -> int:
     Stores the selected site and asks for the job position.
     """
     site = update.message.text
-    if site not in ["work.ua", "robota.ua"]:
+    if site not in ["work.ua", "robota.ua", FederatedParser.SITE]:
         await update.message.reply_text(
-            "Invalid site selected. Please choose either 'work.ua' or 'robota.ua'."
+            "Invalid site selected. Please choose 'work.ua', 'robota.ua' "
+            f"or '{FederatedParser.SITE}'."
         )
         return SELECT_SITE
 
@@ -86,7 +151,8 @@ async def set_location(update: Update, context: CallbackContext) -> int:
         user_data[update.message.from_user.id]["location"] = None
 
     site = user_data[update.message.from_user.id]["site"]
-    if site == "work.ua":
+    # Searches of both sites take their criteria as for work.ua.
+    if site in ["work.ua", FederatedParser.SITE]:
         await update.message.reply_text(
             "Location set.\n\nPlease enter the years of experience\n"
             "(0 - No experience,\n"
@@ -120,7 +186,7 @@ async def set_years_of_experience(update: Update, context: CallbackContext) -> i
     experience = update.message.text.lower()
     site = user_data[update.message.from_user.id]["site"]
 
-    if site == "work.ua":
+    if site in ["work.ua", FederatedParser.SITE]:
         if experience != "skip":
             if experience in WorkUAParser.EXPERIENCE_MAP.keys():
                 user_data[update.message.from_user.id]["experience"] = experience
@@ -169,7 +235,7 @@ async def set_expected_salary(update: Update, context: CallbackContext) -> int:
     """
     salary = update.message.text.lower()
     site = user_data[update.message.from_user.id]["site"]
-    if site == "work.ua":
+    if site in ["work.ua", FederatedParser.SITE]:
         if salary != "skip":
             if salary in WorkUAParser.SALARY_MAP.keys():
                 user_data[update.message.from_user.id]["salary"] = salary
@@ -203,14 +269,15 @@ async def set_keywords(update: Update, context: CallbackContext) -> int:
     """
     keywords = update.message.text.lower()
     if keywords != "skip":
-        user_data[update.message.from_user.id]["keywords"] = [
-            keyword.strip() for keyword in keywords.split(",")
-        ]
+        user_data[update.message.from_user.id]["keywords"] = list(
+            parse_skills(keywords)
+        )
     else:
         user_data[update.message.from_user.id]["keywords"] = []
 
     await update.message.reply_text(
-        "Keywords set.\n\nType /fetch to get resumes based on these criteria.\n\n"
+        "Keywords set.\n\nType /fetch to get resumes based on these criteria, "
+        "or /save to be sent new matching resumes as they appear.\n\n"
         "If nothing happens, please try again",
         reply_markup=ReplyKeyboardRemove(),
     )
@@ -220,44 +287,151 @@ async def set_keywords(update: Update, context: CallbackContext) -> int:
 
 async def fetch_resumes(update: Update, context: CallbackContext) -> int:
     """
-    Fetches the resumes based on the stored criteria.
+    Starts a background search based on the stored criteria.
     """
-    await update.message.reply_text("Fetching resumes, please wait...")
+    user_id = update.message.from_user.id
+    if crawl_jobs.is_running(user_id):
+        await update.message.reply_text(
+            "Your previous search is still running. Type /cancel to stop it."
+        )
+        return ConversationHandler.END
 
-    site = user_data[update.message.from_user.id]["site"]
-    position = user_data[update.message.from_user.id]["position"]
-    location = user_data[update.message.from_user.id]["location"]
-    keywords = user_data[update.message.from_user.id]["keywords"]
-    experience = user_data[update.message.from_user.id].get("experience")
-    salary = user_data[update.message.from_user.id].get("salary")
+    status = await update.message.reply_text(
+        "Fetching resumes, please wait...", reply_markup=STOP_SEARCH_MARKUP
+    )
+
+    criteria = dict(user_data[user_id])
+    popular_searches.record(_query_key(criteria), criteria)
+    crawl_jobs.start(user_id, _search_and_reply(update, status, criteria))
+    return ConversationHandler.END
 
+
+def _query_key(criteria: dict):
+    """
+    Identifies the search for the given criteria, regardless of the keywords.
+    """
+    site = criteria["site"]
+    args = (
+        criteria["position"],
+        criteria["location"],
+        criteria.get("experience"),
+        criteria.get("salary"),
+    )
+    if site == FederatedParser.SITE:
+        return site, FederatedParser.query_key(*args)
     if site == "work.ua":
-        resumes = WorkUAParser.fetch_resumes(
+        return site, WorkUAParser.query_key(*args)
+    return site, RobotaUAParser.query_key(*args)
+
+
+def _resume_stream(
+    criteria: dict,
+    progress: CrawlProgress,
+    max_details=None,
+    incremental=False,
+    top_k=None,
+):
+    """
+    Streams the resumes matching the given criteria from the selected site,
+    downloading at most `max_details` resume pages per site if given. See
+    `WorkUAParser.aiter_resumes` for `incremental` crawls and `top_k` pruning.
+    """
+    site = criteria["site"]
+    position = criteria["position"]
+    location = criteria["location"]
+    experience = criteria.get("experience")
+    salary = criteria.get("salary")
+
+    if site == FederatedParser.SITE:
+        return FederatedParser.aiter_resumes(
             position,
             location,
-            keywords,
-            limit=5,
-            experience=experience,
-            salary=salary,
+            experience,
+            salary,
+            top_k=top_k,
+            max_pages=SEARCH_MAX_PAGES,
+            max_details=max_details,
+            robota_ua_backend=ROBOTA_UA_BACKEND,
+            executor=crawl_jobs.executor,
+            progress=progress,
+            incremental=incremental,
         )
-    elif site == "robota.ua":
-        resumes = RobotaUAParser.fetch_resumes(
+    if site == "work.ua":
+        return WorkUAParser.aiter_resumes(
             position,
             location,
-            keywords,
-            limit=5,
-            experience=experience,
-            salary=salary,
+            experience,
+            salary,
+            top_k=top_k,
+            max_pages=SEARCH_MAX_PAGES,
+            max_details=max_details,
+            progress=progress,
+            incremental=incremental,
         )
+    return RobotaUAParser.aiter_resumes(
+        position,
+        location,
+        experience,
+        salary,
+        top_k=top_k,
+        max_pages=SEARCH_MAX_PAGES,
+        max_details=max_details,
+        backend=ROBOTA_UA_BACKEND,
+        executor=crawl_jobs.executor,
+        progress=progress,
+        incremental=incremental,
+    )
+
+
+async def _indexed_resume_stream(
+    criteria: dict, progress: CrawlProgress, top_k: SharedTopK = None
+):
+    """
+    Streams the best matching resumes of earlier searches from the search index,
+    so they show up at once, then the live results of the selected site, pruned
+    by `top_k` if given.
+    """
+    site = criteria["site"]
+    indexed = get_search_index().search(
+        criteria["position"],
+        criteria["location"],
+        criteria["keywords"],
+        criteria.get("experience"),
+        criteria.get("salary"),
+        limit=SEARCH_RESULTS,
+        site=None if site == FederatedParser.SITE else site,
+    )
+    for resume in indexed:
+        yield resume
+
+    async with aclosing(_resume_stream(criteria, progress, top_k=top_k)) as resumes:
+        async for resume in resumes:
+            yield resume
+
+
+async def _search_and_reply(update: Update, status: Message, criteria: dict) -> None:
+    """
+    Runs the search for the given criteria and sends the results to the user.
+
+    Identical searches share one crawl: when someone else is running the same
+    search, or ran it within the query cache TTL, the resumes it found are
+    ranked by the user's own keywords instead of crawling again.
+    """
+    key = _query_key(criteria)
+    shared, owner = get_query_cache().join(key)
+    if owner:
+        resumes = await _crawl_and_report(update, status, criteria, key, shared)
+    else:
+        resumes = await _wait_for_shared_search(update, status, criteria, shared)
 
     if resumes:
         for resume in resumes:
             await update.message.reply_text(
-                f"<b>Position:</b> {resume.position}\n"
-                f"<b>Experience:</b> {resume.experience}\n"
-                f"<b>Skills:</b> {resume.skills}\n"
-                f"<b>Location:</b> {resume.location}\n"
-                f"<b>Salary:</b> {resume.salary}\n"
+                f"<b>Position:</b> {resume.position_text}\n"
+                f"<b>Experience:</b> {resume.experience_text}\n"
+                f"<b>Skills:</b> {resume.skills_text}\n"
+                f"<b>Location:</b> {resume.location_text}\n"
+                f"<b>Salary:</b> {resume.salary_text}\n"
                 f"<a href='{resume.link}'>Resume Link</a>",
                 parse_mode="HTML",
             )
@@ -265,12 +439,430 @@ async def fetch_resumes(update: Update, context: CallbackContext) -> int:
         await update.message.reply_text("No resumes found.")
 
     await update.message.reply_text("If you want to start again print /start")
-    return ConversationHandler.END
+
+
+async def _crawl_and_report(
+    update: Update, status: Message, criteria: dict, key, shared: Future
+) -> list:
+    """
+    Crawls for the given criteria, shares every resume found with identical
+    searches, and returns the best ones for the user's keywords. The crawl is
+    pruned by the user's keywords until an identical search joins it; pruned
+    results are not cached for later searches.
+
+    While the search runs, `status` shows its progress and a separate message
+    shows the best resumes so far; both are refreshed at most every
+    `PROGRESS_UPDATE_INTERVAL` seconds. Stopping the search keeps what it found.
+    """
+    user_id = update.message.from_user.id
+    top_k = TopK(SEARCH_RESULTS, criteria["keywords"])
+    pruning = SharedTopK(top_k, lambda: get_query_cache().joined(key))
+    progress = CrawlProgress()
+    found = []
+    failed = False
+    preview = None
+    top_changed = False
+    loop = asyncio.get_running_loop()
+    last_update = loop.time()
+
+    stream = until_set(
+        adeduplicate(_indexed_resume_stream(criteria, progress, pruning)),
+        crawl_jobs.stop_event(user_id),
+    )
+    try:
+        async with aclosing(stream):
+            async for resume in stream:
+                found.append(resume)
+                top_changed = top_k.push(resume) or top_changed
+
+                if loop.time() - last_update < PROGRESS_UPDATE_INTERVAL:
+                    continue
+                last_update = loop.time()
+
+                await _edit_message(
+                    status,
+                    _format_progress(progress, len(found), top_k),
+                    reply_markup=STOP_SEARCH_MARKUP,
+                )
+                if top_changed:
+                    preview = await _show_preview(update, preview, top_k.results())
+                    top_changed = False
+
+    except asyncio.CancelledError as e:
+        get_query_cache().abandon(key, shared, e)
+        raise
+
+    except Exception as e:
+        print(f"Error fetching resumes: {e}")
+        failed = True
+
+    stopped = crawl_jobs.stop_event(user_id).is_set()
+    # Partial results still go to the searches waiting on this one, but are
+    # not cached for later ones, which may rank them by other keywords.
+    complete = not (stopped or failed or pruning.pruned)
+    get_query_cache().finish(key, shared, found, store=complete)
+
+    summary = "Search stopped." if stopped else "Search finished."
+    await _edit_message(
+        status, f"{summary}\n{_format_progress(progress, len(found), top_k)}"
+    )
+    if preview:
+        try:
+            await preview.delete()
+        except TelegramError as e:
+            logger.warning("Could not delete message: %s", e)
+
+    return top_k.results()
+
+
+async def _wait_for_shared_search(
+    update: Update, status: Message, criteria: dict, shared: Future
+) -> list:
+    """
+    Waits for the resumes of an identical search, and returns the best ones for
+    the user's keywords. Stopping the wait returns nothing.
+    """
+    if not shared.done():
+        await _edit_message(
+            status,
+            "An identical search is already running, waiting for its results...",
+            reply_markup=STOP_SEARCH_MARKUP,
+        )
+
+    # Shielded, since cancelling the wait must not cancel the shared future.
+    results = asyncio.shield(asyncio.wrap_future(shared))
+    stopped = asyncio.ensure_future(
+        crawl_jobs.stop_event(update.message.from_user.id).wait()
+    )
+    try:
+        await asyncio.wait({results, stopped}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        stopped.cancel()
+
+    if not results.done():
+        results.cancel()
+        await _edit_message(status, "Search stopped.")
+        return []
+
+    try:
+        resumes = results.result()
+    except Exception as e:
+        print(f"Error fetching resumes: {e}")
+        resumes = ()
+
+    top_k = TopK(SEARCH_RESULTS, criteria["keywords"])
+    for resume in resumes:
+        # Shared resumes are scored on copies, as every search ranks them anew.
+        top_k.push(replace(resume))
+    await _edit_message(
+        status, f"Search finished.\nShared an identical search: {len(resumes)} resumes."
+    )
+    return top_k.results()
+
+
+async def precrawl_popular_searches(context: CallbackContext) -> None:
+    """
+    Crawls the most popular searches again in the background, so users running
+    them get warm results: the resumes found are shared with identical searches
+    for the query cache TTL and indexed at once, and their pages are cached.
+    Crawls are incremental, so they only fetch the results that are new since
+    the previous round.
+
+    A round sends at most `PRECRAWL_REQUEST_BUDGET` requests, and gives way to
+    users: it does not start, or ends early, while any user search is running.
+    """
+    budget = PRECRAWL_REQUEST_BUDGET
+    crawled = False
+    for criteria in popular_searches.top(PRECRAWL_SEARCHES):
+        if budget <= 0 or crawl_jobs.running:
+            break
+        _, requests, _ = await _background_crawl(criteria, budget)
+        budget -= requests
+        crawled = True
+
+    if crawled:
+        await asyncio.to_thread(get_search_index().rebuild)
+
+
+async def check_saved_searches(context: CallbackContext) -> None:
+    """
+    Crawls the saved searches incrementally and sends their users the new
+    resumes scoring at least `SAVED_SEARCH_MIN_SCORE` for their keywords.
+    Searches without keywords, saved before they had to have them, are skipped.
+
+    Saved searches with the same criteria share one crawl, and the searches
+    checked longest ago go first. Like the pre-crawl, a round sends at most
+    `SAVED_SEARCH_REQUEST_BUDGET` requests and gives way to user searches. The
+    first check of a search only notes the resumes already there, so users are
+    only sent resumes that show up after they saved it.
+    """
+    store = get_saved_searches()
+    groups = {}
+    for search in store.all():
+        # Without keywords every resume scores well on its attributes alone.
+        if not KeywordQuery(search.criteria.get("keywords")).terms:
+            continue
+        groups.setdefault(_query_key(search.criteria), []).append(search)
+
+    budget = SAVED_SEARCH_REQUEST_BUDGET
+    crawled = False
+    notifications = {}
+    for searches in groups.values():
+        if budget <= 0 or crawl_jobs.running:
+            break
+        resumes, requests, complete = await _background_crawl(
+            searches[0].criteria, budget
+        )
+        budget -= requests
+        crawled = True
+
+        for search in searches:
+            if search.checked_at is None and not complete:
+                continue
+            matches = _new_matches(store, search, resumes)
+            if search.checked_at is None:
+                store.mark_notified(search.search_id, [r.link for r in matches])
+            else:
+                notifications.setdefault(search.chat_id, []).extend(
+                    (search, resume) for resume in matches
+                )
+            store.mark_checked(search.search_id)
+
+    if crawled:
+        await asyncio.to_thread(get_search_index().rebuild)
+    await _send_notifications(context.bot, store, notifications)
+
+
+async def _background_crawl(criteria: dict, budget: int):
+    """
+    Crawls a search incrementally for a background job, sending at most `budget`
+    requests and stopping as soon as a user search starts. A complete crawl is
+    shared with identical searches through the query cache.
+
+    Returns:
+        tuple: The resumes found, the number of requests sent, and whether the
+        crawl completed.
+    """
+    progress = CrawlProgress()
+    found, interrupted = [], True
+    stream = adeduplicate(
+        _resume_stream(criteria, progress, max_details=budget, incremental=True)
+    )
+    try:
+        async with aclosing(stream):
+            async for resume in stream:
+                found.append(resume)
+                requests = progress.pages_scanned + progress.details_fetched
+                if crawl_jobs.running or requests >= budget:
+                    break
+            else:
+                interrupted = False
+
+    except Exception as e:
+        print(f"Error crawling resumes in the background: {e}")
+
+    requests = progress.pages_scanned + progress.details_fetched
+    # A crawl cut short, by users or by the budget, is not complete.
+    complete = not interrupted and requests < budget
+    if complete:
+        get_query_cache().put(_query_key(criteria), found)
+    return found, requests, complete
+
+
+def _new_matches(store: SavedSearches, search: SavedSearch, resumes: list) -> list:
+    """
+    Picks the resumes scoring high enough for a saved search that its user has
+    not been sent yet, best first, as scored copies.
+    """
+    query = KeywordQuery(search.criteria.get("keywords"))
+    # With few keywords no resume could reach the threshold.
+    threshold = min(SAVED_SEARCH_MIN_SCORE, query.max_score)
+    matches = {}
+    for resume, score in zip(resumes, query.score_many(resumes)):
+        if score >= threshold:
+            matches[resume.link] = replace(resume, relevance_score=score)
+
+    links = store.unnotified(search.search_id, matches)
+    return sorted(
+        (matches[link] for link in links),
+        key=lambda resume: resume.relevance_score,
+        reverse=True,
+    )
+
+
+async def _send_notifications(bot, store: SavedSearches, notifications: dict) -> None:
+    """
+    Sends every chat one message with its best new resumes, at most
+    `SAVED_SEARCH_MAX_RESUMES` of them; the rest wait for the next round. Messages
+    are spaced out to stay under the Telegram rate limits.
+    """
+    for chat_id, matches in notifications.items():
+        matches.sort(key=lambda match: match[1].relevance_score, reverse=True)
+        matches = matches[:SAVED_SEARCH_MAX_RESUMES]
+        if not matches:
+            continue
+
+        text = "<b>New resumes for your saved searches:</b>\n" + "\n".join(
+            f"{i}. <a href='{resume.link}'>{html.escape(resume.position_text)}</a>"
+            f" ({html.escape(search.criteria['position'])}, score {resume.relevance_score})"
+            for i, (search, resume) in enumerate(matches, start=1)
+        )
+        for attempt in range(2):
+            try:
+                await bot.send_message(
+                    chat_id, text, parse_mode="HTML", disable_web_page_preview=True
+                )
+            except RetryAfter as e:
+                if attempt == 0:
+                    await asyncio.sleep(e.retry_after)
+                    continue
+                logger.warning("Could not notify chat %s: %s", chat_id, e)
+            except TelegramError as e:
+                logger.warning("Could not notify chat %s: %s", chat_id, e)
+            else:
+                sent = {}
+                for search, resume in matches:
+                    sent.setdefault(search.search_id, []).append(resume.link)
+                for search_id, links in sent.items():
+                    store.mark_notified(search_id, links)
+            break
+
+        await asyncio.sleep(NOTIFICATION_INTERVAL)
+
+
+def _format_progress(progress: CrawlProgress, resumes_parsed: int, top_k: TopK) -> str:
+    best = top_k.results()[:1]
+    return (
+        f"Pages scanned: {progress.pages_scanned}\n"
+        f"Resumes parsed: {resumes_parsed}\n"
+        f"Best score: {best[0].relevance_score if best else '-'}"
+    )
+
+
+async def _show_preview(update: Update, preview: Message, resumes: list) -> Message:
+    """
+    Sends or refreshes the message listing the best resumes found so far.
+    """
+    text = "<b>Best resumes so far:</b>\n" + "\n".join(
+        f"{i}. <a href='{resume.link}'>{html.escape(resume.position_text)}</a>"
+        f" (score {resume.relevance_score})"
+        for i, resume in enumerate(resumes, start=1)
+    )
+    if preview is None:
+        return await update.message.reply_text(
+            text, parse_mode="HTML", disable_web_page_preview=True
+        )
+    await _edit_message(preview, text, parse_mode="HTML", disable_web_page_preview=True)
+    return preview
+
+
+async def _edit_message(message: Message, text: str, **kwargs) -> None:
+    """
+    Edits a message, ignoring failures: progress updates are best effort.
+    """
+    try:
+        await message.edit_text(text, **kwargs)
+    except TelegramError as e:
+        logger.warning("Could not update message: %s", e)
+
+
+async def save_search(update: Update, context: CallbackContext) -> None:
+    """
+    Saves the user's search criteria, to be sent new matching resumes later.
+    """
+    user_id = update.message.from_user.id
+    criteria = user_data.get(user_id)
+    if not criteria or "keywords" not in criteria:
+        await update.message.reply_text(
+            "Set up a search first: type /start and follow the steps."
+        )
+        return
+    if not KeywordQuery(criteria["keywords"]).terms:
+        await update.message.reply_text(
+            "New resumes are picked by your keywords, so only searches with "
+            "keywords can be saved. Type /start to set up a search with keywords."
+        )
+        return
+
+    store = get_saved_searches()
+    if len(store.for_user(user_id)) >= MAX_SAVED_SEARCHES:
+        await update.message.reply_text(
+            f"You can save up to {MAX_SAVED_SEARCHES} searches. "
+            "Type /searches to see them and /unsave to remove one."
+        )
+        return
+
+    search_id = store.add(user_id, update.message.chat_id, dict(criteria))
+    await update.message.reply_text(
+        f"Search #{search_id} saved. You will be sent new resumes matching it as "
+        "they appear.\n\nType /searches to see your saved searches."
+    )
+
+
+async def list_saved_searches(update: Update, context: CallbackContext) -> None:
+    """
+    Lists the user's saved searches.
+    """
+    searches = get_saved_searches().for_user(update.message.from_user.id)
+    if not searches:
+        await update.message.reply_text("You have no saved searches.")
+        return
+
+    await update.message.reply_text(
+        "<b>Your saved searches:</b>\n"
+        + "\n".join(
+            f"#{search.search_id}: {html.escape(_describe_criteria(search.criteria))}"
+            for search in searches
+        )
+        + "\n\nType /unsave followed by a number to remove a search.",
+        parse_mode="HTML",
+    )
+
+
+async def delete_saved_search(update: Update, context: CallbackContext) -> None:
+    """
+    Removes one of the user's saved searches, given its number.
+    """
+    args = context.args or []
+    search_id = args[0].lstrip("#") if args else ""
+    if not search_id.isdigit():
+        await update.message.reply_text(
+            "Type /unsave followed by the number of a search, e.g. /unsave 3."
+        )
+        return
+
+    if get_saved_searches().remove(update.message.from_user.id, int(search_id)):
+        await update.message.reply_text(f"Search #{search_id} removed.")
+    else:
+        await update.message.reply_text(f"You have no saved search #{search_id}.")
+
+
+def _describe_criteria(criteria: dict) -> str:
+    parts = [criteria["site"], criteria["position"]]
+    if criteria.get("location"):
+        parts.append(criteria["location"])
+    if criteria.get("keywords"):
+        parts.append(", ".join(criteria["keywords"]))
+    return " / ".join(parts)
+
+
+async def stop_search(update: Update, context: CallbackContext) -> None:
+    """
+    Stops the user's running search early when they press its Stop button.
+    """
+    query = update.callback_query
+    if crawl_jobs.stop(query.from_user.id):
+        await query.answer("Stopping the search...")
+    else:
+        await query.answer("This search is no longer running.")
 
 
 async def cancel(update: Update, context: CallbackContext) -> int:
     """
-    Cancels the current conversation.
+    Cancels the current conversation and any search the user has running.
     """
-    await update.message.reply_text("Operation cancelled.")
+    if crawl_jobs.cancel(update.message.from_user.id):
+        await update.message.reply_text("Search cancelled.")
+    else:
+        await update.message.reply_text("Operation cancelled.")
     return ConversationHandler.END
@@ -0,0 +1,14 @@
+import pytest
+
+import utils.dedup as dedup
+from utils.dedup import SimHashIndex
+
+
+@pytest.fixture(autouse=True)
+def dedup_index(monkeypatch, tmp_path):
+    """
+    Gives every test a fresh near-duplicate index instead of the shared one.
+    """
+    monkeypatch.setattr(
+        dedup, "_simhash_index", SimHashIndex(str(tmp_path / "dedup.sqlite3"))
+    )
@@ -0,0 +1,25 @@
+import asyncio
+
+from parsers.crawler import AsyncCrawler, get_rate_limiter
+
+
+def test_crawlers_share_rate_limiter_of_host():
+    first = AsyncCrawler(requests_per_second=20)
+    second = AsyncCrawler(requests_per_second=5)
+
+    _, first_limiter = first._host_limits("https://shared.example/a")
+    _, second_limiter = second._host_limits("https://shared.example/b")
+
+    assert first_limiter is second_limiter
+    assert first_limiter.max_rate == 5
+    assert first_limiter is not get_rate_limiter("other.example", 20)
+
+
+def test_shared_rate_limiter_works_across_event_loops():
+    rate_limiter = get_rate_limiter("loops.example", 1000)
+
+    async def burst():
+        await asyncio.gather(*(rate_limiter.wait() for _ in range(3)))
+
+    asyncio.run(burst())
+    asyncio.run(burst())
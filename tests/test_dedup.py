@@ -0,0 +1,69 @@
+from bs4 import BeautifulSoup
+
+from parsers.robota_ua_api import RobotaUAApiParser
+from parsers.work_ua_parser import WorkUAParser
+from utils.dedup import deduplicate
+
+WORK_UA_RESUME = """<html><body>
+<h2 class="mt-lg sm:mt-xl">Python developer</h2>
+<span class="text-muted-print">, 30 000 грн</span>
+<dl><dt>Місто проживання:</dt><dd>Київ</dd></dl>
+<h2>Досвід роботи</h2><div><span class="text-default-7">2 роки 3 місяці</span></div>
+<h2>Освіта</h2>
+<span class="label label-skill label-gray-100"><span class="ellipsis">Python</span></span>
+<span class="label label-skill label-gray-100"><span class="ellipsis">Django</span></span>
+<span class="label label-skill label-gray-100"><span class="ellipsis">Postgres</span></span>
+</body></html>"""
+
+ROBOTA_UA_RESUME = {
+    "speciality": "Python Developer",
+    "cityName": "Kyiv",
+    "salary": 30000,
+    "currencySign": "грн",
+    "skills": [{"name": "python"}, {"name": "django"}, {"name": "PostgreSQL"}],
+    "experiences": [
+        {"startWork": "2021-01-01T00:00:00", "endWork": "2023-05-01T00:00:00"}
+    ],
+}
+
+
+def parse_work_ua(html, resume_id):
+    return WorkUAParser.parse_resume(
+        BeautifulSoup(html, "html.parser"), f"https://www.work.ua/resumes/{resume_id}/"
+    )
+
+
+def parse_robota_ua(data, resume_id):
+    return RobotaUAApiParser.parse_resume(
+        data, f"https://robota.ua/candidates/{resume_id}/"
+    )
+
+
+def test_same_person_on_both_sites_is_kept_once():
+    work_ua = parse_work_ua(WORK_UA_RESUME, 1)
+    robota_ua = parse_robota_ua(ROBOTA_UA_RESUME, 2)
+
+    assert work_ua.experience_months != robota_ua.experience_months
+    assert list(deduplicate([work_ua, robota_ua])) == [work_ua]
+
+
+def test_repost_on_the_same_site_is_kept_once():
+    original = parse_work_ua(WORK_UA_RESUME, 1)
+    repost = parse_work_ua(WORK_UA_RESUME, 3)
+
+    assert list(deduplicate([original, repost, original])) == [original]
+
+
+def test_different_experience_is_kept():
+    junior = parse_robota_ua(ROBOTA_UA_RESUME, 2)
+    senior = parse_robota_ua(
+        {
+            **ROBOTA_UA_RESUME,
+            "experiences": [
+                {"startWork": "2015-01-01T00:00:00", "endWork": "2023-05-01T00:00:00"}
+            ],
+        },
+        4,
+    )
+
+    assert list(deduplicate([junior, senior])) == [junior, senior]
@@ -0,0 +1,53 @@
+import pytest
+
+from data.high_water_marks import HighWaterMarks, IncrementalCrawl
+
+SITE = "work.ua"
+QUERY = "python"
+PAGES = [["9", "8"], ["7", "6"], ["5", "4"]]
+
+
+@pytest.fixture
+def marks(tmp_path):
+    return HighWaterMarks(str(tmp_path / "marks.sqlite3"))
+
+
+def crawl_pages(marks, pages, finish=True):
+    crawl = IncrementalCrawl(SITE, QUERY, marks)
+    for page in pages:
+        if crawl.caught_up(page):
+            break
+        crawl.record(page)
+    if finish:
+        crawl.finish()
+
+
+def test_complete_crawl_is_caught_up(marks):
+    crawl_pages(marks, PAGES)
+
+    crawl = IncrementalCrawl(SITE, QUERY, marks)
+    assert crawl.caught_up(PAGES[0])
+
+
+def test_crawl_cut_short_is_not_trusted(marks):
+    crawl_pages(marks, PAGES[:1], finish=False)
+
+    crawl = IncrementalCrawl(SITE, QUERY, marks)
+    assert not crawl.caught_up(PAGES[0])
+    assert not crawl.caught_up(PAGES[1])
+
+
+def test_crawl_cut_short_after_a_complete_one_is_not_trusted(marks):
+    crawl_pages(marks, PAGES)
+    # New resumes push the old ones down; this crawl stops before reaching them.
+    crawl_pages(marks, [["12", "11"]], finish=False)
+
+    crawl = IncrementalCrawl(SITE, QUERY, marks)
+    assert not crawl.caught_up(["12", "11"])
+
+    crawl.record(["12", "11"])
+    crawl.record(["10", "9"])
+    assert not crawl.caught_up(["8", "7"])
+    crawl.finish()
+
+    assert IncrementalCrawl(SITE, QUERY, marks).caught_up(["12", "11"])
@@ -0,0 +1,191 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import parsers.robota_ua_api as robota_ua_api
+from data.resume_cache import ResumeCache
+from parsers.robota_ua_api import RobotaUAApiParser
+
+FIXTURES = Path(__file__).parent / "fixtures" / "robota_ua_api"
+
+
+def load_fixture(name):
+    return json.loads((FIXTURES / name).read_text(encoding="utf-8"))
+
+
+class StubApi:
+    """
+    Local stand-in for the robota.ua API, serving the recorded responses.
+    Resume 103 answers with a broken body, like an error page served as JSON.
+    """
+
+    def __init__(self):
+        self.search_payloads = []
+        self.app = web.Application()
+        self.app.router.add_post("/cvdb/resumes", self.search)
+        self.app.router.add_get("/resume/{resume_id}", self.resume)
+
+    async def search(self, request):
+        self.search_payloads.append(await request.json())
+        return web.json_response(load_fixture("search.json"))
+
+    async def resume(self, request):
+        resume_id = request.match_info["resume_id"]
+        if resume_id == "103":
+            return web.Response(text="<html>Service unavailable</html>")
+        return web.Response(
+            text=(FIXTURES / f"resume_{resume_id}.json").read_text(encoding="utf-8"),
+            content_type="application/json",
+        )
+
+
+@pytest.fixture
+def stub_api():
+    return StubApi()
+
+
+def crawl(stub_api, monkeypatch, coroutine_function, *args, **kwargs):
+    async def run():
+        async with TestServer(stub_api.app) as server:
+            monkeypatch.setattr(
+                RobotaUAApiParser, "SEARCH_URL", str(server.make_url("/cvdb/resumes"))
+            )
+            monkeypatch.setattr(
+                RobotaUAApiParser,
+                "RESUME_URL",
+                str(server.make_url("/resume")) + "/{resume_id}",
+            )
+            return await coroutine_function(*args, **kwargs)
+
+    return asyncio.run(run())
+
+
+async def collect(resumes):
+    return [resume async for resume in resumes]
+
+
+def test_parse_resume():
+    resume = RobotaUAApiParser.parse_resume(
+        load_fixture("resume_101.json"), "https://robota.ua/candidates/101/"
+    )
+
+    assert resume.position == "Python developer"
+    assert resume.experience_months == 38
+    assert resume.skills == ("docker", "postgresql", "python")
+    assert resume.city_id == "kyiv"
+    assert resume.salary_uah == 1500 * 41
+    assert resume.salary_text == "$1 500"
+    assert not resume.partial
+
+
+def test_parse_resume_with_skills_as_text():
+    resume = RobotaUAApiParser.parse_resume(
+        load_fixture("resume_102.json"), "https://robota.ua/candidates/102/"
+    )
+
+    assert resume.skills == ("java", "spring")
+    assert resume.experience_months is None
+    assert resume.salary_uah is None
+
+
+def test_extract_resume_cards():
+    cards = RobotaUAApiParser._extract_resume_cards(load_fixture("search.json"))
+
+    assert [card.link for card in cards] == [
+        "https://robota.ua/candidates/101/",
+        "https://robota.ua/candidates/102/",
+        "https://robota.ua/candidates/103/",
+    ]
+    assert all(card.partial for card in cards)
+    assert [card.city_id for card in cards] == ["kyiv", "lviv", "odesa"]
+    assert [card.salary_uah for card in cards] == [1500 * 41, None, 40000]
+
+
+@pytest.mark.parametrize(
+    "location, city_id",
+    [
+        ("Київ", 1),
+        ("kyiv", 1),
+        (" Kiev ", 1),
+        ("Харків", 21),
+        ("Житомир", 0),
+        (None, 0),
+    ],
+)
+def test_search_payload_maps_cities(location, city_id):
+    payload = RobotaUAApiParser._build_search_payload("python", location, None, None, 1)
+
+    assert payload["cityId"] == city_id
+
+
+@pytest.mark.parametrize(
+    "salary, salary_to",
+    [
+        ("20000", 20000),
+        ("20 000", 20000),
+        ("20k", 20000),
+        ("20 тис", 20000),
+        ("$500", 500 * 41),
+        (30000, 30000),
+        ("negotiable", None),
+        (None, None),
+    ],
+)
+def test_search_payload_parses_salary(salary, salary_to):
+    payload = RobotaUAApiParser._build_search_payload("python", None, None, salary, 1)
+
+    assert payload["salary"] == {"from": None, "to": salary_to}
+
+
+def test_aiter_resumes_skips_broken_resume(stub_api, monkeypatch, capsys):
+    resumes = crawl(
+        stub_api,
+        monkeypatch,
+        collect,
+        RobotaUAApiParser.aiter_resumes("python", "Київ", use_cache=False),
+    )
+
+    assert [resume.link for resume in resumes] == [
+        "https://robota.ua/candidates/101/",
+        "https://robota.ua/candidates/102/",
+    ]
+    assert stub_api.search_payloads[0]["cityId"] == 1
+    assert "Error reading resume at URL https://robota.ua/candidates/103/" in (
+        capsys.readouterr().out
+    )
+
+
+def test_aiter_resumes_falls_back_to_stale_resume(stub_api, monkeypatch, tmp_path):
+    cache = ResumeCache(str(tmp_path / "cache.sqlite3"), ttl=-1)
+    stale = RobotaUAApiParser.parse_resume(
+        {"speciality": "Python developer", "cityName": "Одеса", "salary": 40000},
+        "https://robota.ua/candidates/103/",
+    )
+    cache.put(RobotaUAApiParser.SITE, "103", stale)
+    monkeypatch.setattr(robota_ua_api, "get_resume_cache", lambda: cache)
+
+    resumes = crawl(
+        stub_api, monkeypatch, collect, RobotaUAApiParser.aiter_resumes("python")
+    )
+
+    assert resumes[-1] == stale
+    assert cache.lookup(RobotaUAApiParser.SITE, "101").resume == resumes[0]
+
+
+def test_fetch_resumes_async_ranks_by_keywords(stub_api, monkeypatch):
+    resumes = crawl(
+        stub_api,
+        monkeypatch,
+        RobotaUAApiParser.fetch_resumes_async,
+        "developer",
+        keywords=["python", "docker"],
+        limit=1,
+        use_cache=False,
+    )
+
+    assert [resume.link for resume in resumes] == ["https://robota.ua/candidates/101/"]
+    assert resumes[0].relevance_score == 18
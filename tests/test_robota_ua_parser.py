@@ -0,0 +1,39 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from selenium.common.exceptions import TimeoutException
+
+from parsers.robota_ua_parser import RobotaUAParser
+
+
+class StubDriver:
+    """
+    Stand-in for a browser that renders every page except those in `broken`,
+    which time out.
+    """
+
+    def __init__(self, broken):
+        self.broken = broken
+        self.url = None
+
+    def get(self, url):
+        if url in self.broken:
+            raise TimeoutException("page load timed out")
+        self.url = url
+
+    def find_element(self, *locator):
+        return object()
+
+    @property
+    def page_source(self):
+        return f"<html>{self.url}</html>"
+
+
+def test_load_resume_pages_skips_failed_page(capsys):
+    urls = [f"https://robota.ua/candidates/{resume_id}/" for resume_id in (1, 2, 3)]
+    drivers = [StubDriver(broken={urls[1]}) for _ in range(2)]
+
+    with ThreadPoolExecutor(max_workers=len(drivers)) as executor:
+        pages = list(RobotaUAParser._load_resume_pages(drivers, executor, urls))
+
+    assert pages == [f"<html>{urls[0]}</html>", None, f"<html>{urls[2]}</html>"]
+    assert f"Error loading resume at URL {urls[1]}" in capsys.readouterr().out
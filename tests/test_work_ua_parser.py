@@ -0,0 +1,91 @@
+import asyncio
+import re
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from parsers.work_ua_parser import WorkUAParser
+
+PAGES = 3
+CARDS_PER_PAGE = 4
+# Only resumes on the later pages list the keywords, and only on their pages.
+PYTHON_RESUMES = {1021, 1032, 1033}
+
+
+class StubSite:
+    """
+    Local stand-in for work.ua: result pages of cards with a generic snippet,
+    and resume pages that list the skills.
+    """
+
+    def __init__(self):
+        self.resume_pages_served = 0
+        self.app = web.Application()
+        self.app.router.add_get("/{path:.*}", self.handle)
+
+    async def handle(self, request):
+        match = re.fullmatch(r"/resumes/(\d+)/", request.path)
+        if match:
+            self.resume_pages_served += 1
+            return self.resume_page(int(match.group(1)))
+        page = int(re.search(r"page=(\d+)", request.path_qs).group(1))
+        return self.result_page(page)
+
+    @staticmethod
+    def result_page(page):
+        cards = "".join(
+            f'<div class="card"><h2><a href="/resumes/{resume_id}/" name="{resume_id}">'
+            f"Developer</a></h2><p>Олег, 30 років, Київ</p>"
+            f"<p>Відкритий до пропозицій</p></div>"
+            for resume_id in range(1000 + page * 10, 1000 + page * 10 + CARDS_PER_PAGE)
+        )
+        next_class = "" if page < PAGES else " pointer-none-in-all"
+        return web.Response(
+            text=f'<html><body>{cards}<a class="glyphicon-chevron-right{next_class}">'
+            "</a></body></html>",
+            content_type="text/html",
+        )
+
+    @staticmethod
+    def resume_page(resume_id):
+        skills = ["Python", "Django"] if resume_id in PYTHON_RESUMES else ["Java"]
+        skill_tags = "".join(
+            '<span class="label label-skill label-gray-100">'
+            f'<span class="ellipsis">{skill}</span></span>'
+            for skill in skills
+        )
+        return web.Response(
+            text=f"""<html><body>
+<h2 class="mt-lg sm:mt-xl">Developer {resume_id}</h2>
+<span class="text-muted-print">, 30 000 грн</span>
+<dl><dt>Місто проживання:</dt><dd>Київ</dd></dl>
+<h2>Досвід роботи</h2><div><span class="text-default-7">{resume_id % 10} роки {resume_id % 7} місяці</span></div>
+<h2>Освіта</h2>{skill_tags}</body></html>""",
+            content_type="text/html",
+        )
+
+
+def crawl(monkeypatch, **options):
+    site = StubSite()
+
+    async def run():
+        async with TestServer(site.app) as server:
+            monkeypatch.setattr(
+                WorkUAParser, "BASE_URL", str(server.make_url("/resumes"))
+            )
+            return await WorkUAParser.fetch_resumes_async(
+                "developer", keywords=["python", "django"], use_cache=False, **options
+            )
+
+    return asyncio.run(run()), site
+
+
+def test_pruned_crawl_keeps_top_k(monkeypatch):
+    pruned, _ = crawl(monkeypatch, limit=3)
+    full, site = crawl(monkeypatch)
+
+    assert site.resume_pages_served == PAGES * CARDS_PER_PAGE
+    assert [resume.relevance_score for resume in full[:3]] == [18, 18, 18]
+    assert [WorkUAParser._resume_id(resume.link) for resume in pruned] == [
+        WorkUAParser._resume_id(resume.link) for resume in full[:3]
+    ]
@@ -0,0 +1,156 @@
+import math
+import threading
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List
+
+from data.resume import Resume
+from utils.normalize import normalize_skill, text_terms
+
+
+def resume_terms(resume: Resume) -> List[str]:
+    """
+    Lists the terms of the text of a resume: the words of its position and its
+    skill IDs, normalized alike.
+    """
+    return text_terms(resume.position) + list(resume.skills)
+
+
+class BM25Index:
+    """
+    Term statistics of a corpus of resumes for Okapi BM25 ranking.
+
+    Each term keeps its postings as two parallel arrays of document numbers and
+    term frequencies, so the index stays compact as the corpus grows, and scoring
+    a query only visits the postings of its terms. Resumes are added one at a
+    time, keyed by link; re-adding a changed resume retires its old document,
+    and retired documents are dropped once they make up half of the index.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self._postings: Dict[str, array] = {}
+        self._frequencies: Dict[str, array] = {}
+        self._document_frequency = Counter()
+        self._lengths = array("H")
+        self._keys: List[str] = []
+        self._terms: List[tuple] = []
+        self._documents: Dict[str, int] = {}
+        self._retired = set()
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._documents
+
+    def add(self, resume: Resume) -> None:
+        """
+        Indexes a resume, replacing the previous version indexed under its link.
+        """
+        terms = tuple(sorted(Counter(resume_terms(resume)).items()))
+        with self._lock:
+            self._add(resume.link, terms)
+            if len(self._retired) > len(self._documents):
+                self._compact()
+
+    def add_many(self, resumes: Iterable[Resume]) -> None:
+        for resume in resumes:
+            self.add(resume)
+
+    def scores(self, keywords: Iterable[str]) -> Dict[str, float]:
+        """
+        Scores the indexed resumes that contain any of the keywords.
+
+        Args:
+            keywords (Iterable[str]): The query terms, normalized like skills.
+
+        Returns:
+            Dict[str, float]: BM25 scores by resume link, for matching resumes only.
+        """
+        query = {term for term in map(normalize_skill, keywords) if term}
+        with self._lock:
+            if not self._documents:
+                return {}
+
+            documents = len(self._documents)
+            # tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / average_length))
+            constant_norm = self.K1 * (1 - self.B)
+            # Documents may all be empty, e.g. resumes with no position or skills.
+            length_norm = self.K1 * self.B * documents / max(self._total_length, 1)
+            lengths, retired = self._lengths, self._retired
+            scores = {}
+            for term in query:
+                frequency = self._document_frequency.get(term)
+                if not frequency:
+                    continue
+                idf = math.log(1 + (documents - frequency + 0.5) / (frequency + 0.5))
+                weight = idf * (self.K1 + 1)
+                for document, tf in zip(self._postings[term], self._frequencies[term]):
+                    if document in retired:
+                        continue
+                    scores[document] = scores.get(document, 0.0) + weight * tf / (
+                        tf + constant_norm + length_norm * lengths[document]
+                    )
+
+            return {self._keys[document]: score for document, score in scores.items()}
+
+    def _add(self, key, terms):
+        document = self._documents.get(key)
+        if document is not None:
+            if self._terms[document] == terms:
+                return
+            self._retire(document)
+
+        document = len(self._keys)
+        length = sum(tf for _, tf in terms)
+        self._keys.append(key)
+        self._terms.append(terms)
+        self._lengths.append(min(length, 0xFFFF))
+        self._documents[key] = document
+        self._total_length += length
+        for term, tf in terms:
+            if term not in self._postings:
+                self._postings[term] = array("I")
+                self._frequencies[term] = array("H")
+            self._postings[term].append(document)
+            self._frequencies[term].append(min(tf, 0xFFFF))
+            self._document_frequency[term] += 1
+
+    def _retire(self, document):
+        self._retired.add(document)
+        self._total_length -= self._lengths[document]
+        for term, _ in self._terms[document]:
+            self._document_frequency[term] -= 1
+
+    def _compact(self):
+        live = [
+            (key, self._terms[document])
+            for key, document in self._documents.items()
+            if document not in self._retired
+        ]
+        self._clear()
+        for key, terms in live:
+            self._add(key, terms)
+
+
+_bm25_index = None
+_bm25_index_lock = threading.Lock()
+
+
+def get_bm25_index() -> BM25Index:
+    """
+    Returns the shared BM25 index of the resumes parsed so far.
+    """
+    global _bm25_index
+    with _bm25_index_lock:
+        if _bm25_index is None:
+            _bm25_index = BM25Index()
+        return _bm25_index
@@ -0,0 +1,317 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import aclosing
+from functools import lru_cache
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, List, Optional
+from data.resume import Resume
+
+BITS = 64
+BANDS = 8
+BAND_BITS = BITS // BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+
+WORD_PATTERN = re.compile(r"\w+")
+
+# Resumes with fewer features match too many unrelated ones to be fingerprinted.
+MIN_FEATURES = 4
+
+# How far apart the experience and salary of near-duplicates may be, as each
+# site counts experience a little differently and salaries get rounded.
+EXPERIENCE_TOLERANCE_MONTHS = 6
+SALARY_TOLERANCE = 0.2
+
+
+def resume_features(resume: Resume) -> List[str]:
+    """
+    Lists the words of the position, the skills, the location and the years of
+    experience of a resume. Both sites fill these in for every resume, so the
+    same resume posted on either site gets the same features.
+    """
+    features = [
+        f"position:{word}"
+        for word in WORD_PATTERN.findall((resume.position or "").lower())
+    ]
+
+    features.extend(f"skill:{skill}" for skill in resume.skills)
+
+    if resume.city_id is not None:
+        features.append(f"location:{resume.city_id}")
+    if resume.experience_months is not None:
+        # Whole years, as each site counts the months a little differently.
+        features.append(f"experience:{resume.experience_months // 12}")
+
+    return features
+
+
+def simhash(features: Iterable[str]) -> int:
+    """
+    Computes the 64-bit SimHash of a set of features: similar sets get
+    fingerprints that differ in only a few bits.
+    """
+    vectors = [_feature_vector(feature) for feature in features]
+    if not vectors:
+        return 0
+    return sum(1 << bit for bit, votes in enumerate(zip(*vectors)) if sum(votes) > 0)
+
+
+@lru_cache(maxsize=65536)
+def _feature_vector(feature):
+    """
+    Hashes a feature into one +1/-1 vote per fingerprint bit. Skills, position
+    words and cities repeat across resumes, so the votes are cached.
+    """
+    digest = hashlib.blake2b(feature.encode(), digest_size=BITS // 8).digest()
+    value = int.from_bytes(digest, "big")
+    return tuple(1 if value >> bit & 1 else -1 for bit in range(BITS))
+
+
+class SimHashIndex:
+    """
+    Persistent SQLite-backed index of resume SimHashes that finds near-duplicates
+    without comparing every pair of resumes.
+
+    Fingerprints are split into 8 bands of 8 bits. Two fingerprints at most
+    `max_distance` (< 8) bits apart agree on at least one whole band, so a lookup
+    only compares the resumes that share a band with it. Every resume belongs to
+    a cluster, named after the first resume of its near-duplicates to be indexed.
+    Once the index holds more than `max_entries` resumes, the oldest are dropped.
+
+    Changes are written to SQLite in batches; call `flush` to write them now.
+    """
+
+    DEFAULT_PATH = "resume_dedup.sqlite3"
+    # Reposts and cross-site copies are 0 bits apart. One added skill or title
+    # word moves a resume 7 bits or less about 40% of the time, while under 1 in
+    # 1000 distinct resumes with the same title and city come that close.
+    DEFAULT_MAX_DISTANCE = 7
+    DEFAULT_MAX_ENTRIES = 50_000
+    FLUSH_EVERY = 256
+
+    def __init__(
+        self,
+        path: str = DEFAULT_PATH,
+        max_distance: int = DEFAULT_MAX_DISTANCE,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        if max_distance >= BANDS:
+            raise ValueError(f"max_distance must be below {BANDS}")
+
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._bands = [{} for _ in range(BANDS)]
+        self._unsaved = {}
+        self._evicted = set()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS simhashes ("
+                " link TEXT PRIMARY KEY,"
+                " fingerprint INTEGER NOT NULL,"
+                " cluster TEXT NOT NULL,"
+                " added_at REAL NOT NULL)"
+            )
+
+        for link, fingerprint, cluster in self._connection.execute(
+            "SELECT link, fingerprint, cluster FROM simhashes ORDER BY added_at"
+        ):
+            self._add(link, fingerprint % (1 << BITS), cluster)
+
+    def cluster_of(self, link: str, fingerprint: int) -> str:
+        """
+        Indexes a resume and returns the cluster of near-duplicates it belongs to.
+
+        Args:
+            link (str): The link of the resume.
+            fingerprint (int): The SimHash of the resume.
+
+        Returns:
+            str: The cluster of the resume.
+        """
+        with self._lock:
+            entry = self._entries.get(link)
+            if entry and entry[0] == fingerprint:
+                return entry[1]
+            if entry:
+                self._remove(link)
+
+            cluster = self._find_cluster(fingerprint) or link
+            self._add(link, fingerprint, cluster)
+
+            self._unsaved[link] = (fingerprint, cluster, time.time())
+            self._evicted.discard(link)
+
+            while len(self._entries) > self.max_entries:
+                evicted = next(iter(self._entries))
+                self._remove(evicted)
+                self._unsaved.pop(evicted, None)
+                self._evicted.add(evicted)
+
+            if len(self._unsaved) + len(self._evicted) >= self.FLUSH_EVERY:
+                self._flush()
+            return cluster
+
+    def flush(self) -> None:
+        """
+        Writes the changes made since the last flush to SQLite.
+        """
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        rows = []
+        for link, (fingerprint, cluster, added_at) in self._unsaved.items():
+            # SQLite integers are signed.
+            if fingerprint >> (BITS - 1):
+                fingerprint -= 1 << BITS
+            rows.append((link, fingerprint, cluster, added_at))
+
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO simhashes"
+                " (link, fingerprint, cluster, added_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._connection.executemany(
+                "DELETE FROM simhashes WHERE link = ?",
+                [(link,) for link in self._evicted],
+            )
+        self._unsaved.clear()
+        self._evicted.clear()
+
+    def _find_cluster(self, fingerprint):
+        max_distance = self.max_distance
+        for band, buckets in zip(self._bands_of(fingerprint), self._bands):
+            for link, other in buckets.get(band, {}).items():
+                if (fingerprint ^ other).bit_count() <= max_distance:
+                    return self._entries[link][1]
+        return None
+
+    def _add(self, link, fingerprint, cluster):
+        self._entries[link] = (fingerprint, cluster)
+        for band, buckets in zip(self._bands_of(fingerprint), self._bands):
+            buckets.setdefault(band, {})[link] = fingerprint
+
+    def _remove(self, link):
+        fingerprint, _ = self._entries.pop(link)
+        for band, buckets in zip(self._bands_of(fingerprint), self._bands):
+            bucket = buckets[band]
+            del bucket[link]
+            if not bucket:
+                del buckets[band]
+
+    @staticmethod
+    def _bands_of(fingerprint):
+        return [fingerprint >> (i * BAND_BITS) & BAND_MASK for i in range(BANDS)]
+
+
+class NearDuplicateFilter:
+    """
+    Recognizes resumes that are near-duplicates of one already seen in the same
+    search, such as reposts, edited titles or the same resume on both sites.
+    """
+
+    def __init__(self, index: Optional[SimHashIndex] = None):
+        self.index = index or get_simhash_index()
+        self._seen_links = set()
+        self._seen_clusters = {}
+
+    def is_duplicate(self, resume: Resume) -> bool:
+        """
+        Checks whether the resume, or a near-duplicate of it that agrees on
+        experience and salary within the tolerances, was already seen. Resumes
+        with too little to compare only match their own link.
+        """
+        if resume.link in self._seen_links:
+            return True
+        self._seen_links.add(resume.link)
+
+        features = resume_features(resume)
+        if len(features) < MIN_FEATURES:
+            return False
+
+        cluster = self.index.cluster_of(resume.link, simhash(features))
+        seen = self._seen_clusters.setdefault(cluster, [])
+        if any(_agree(resume, other) for other in seen):
+            return True
+        seen.append(resume)
+        return False
+
+
+def _agree(resume, other):
+    return _close(
+        resume.experience_months,
+        other.experience_months,
+        EXPERIENCE_TOLERANCE_MONTHS,
+    ) and _close(
+        resume.salary_uah,
+        other.salary_uah,
+        SALARY_TOLERANCE * max(resume.salary_uah or 0, other.salary_uah or 0),
+    )
+
+
+def _close(value, other, tolerance):
+    """
+    Compares two attributes, of which an unspecified one matches anything.
+    """
+    return value is None or other is None or abs(value - other) <= tolerance
+
+
+def deduplicate(resumes: Iterable[Resume]) -> Iterator[Resume]:
+    """
+    Drops the near-duplicates from a stream of resumes, keeping the first one seen.
+    """
+    duplicates = NearDuplicateFilter()
+    try:
+        for resume in resumes:
+            if not duplicates.is_duplicate(resume):
+                yield resume
+    finally:
+        duplicates.index.flush()
+
+
+async def adeduplicate(resumes: AsyncIterable[Resume]) -> AsyncIterator[Resume]:
+    """
+    Asynchronous counterpart of `deduplicate`.
+    """
+    duplicates = NearDuplicateFilter()
+    try:
+        async with aclosing(resumes):
+            async for resume in resumes:
+                if not duplicates.is_duplicate(resume):
+                    yield resume
+    finally:
+        duplicates.index.flush()
+
+
+_simhash_index = None
+_simhash_index_lock = threading.Lock()
+
+
+def get_simhash_index() -> SimHashIndex:
+    """
+    Returns the shared near-duplicate index, configured from the DEDUP_INDEX_PATH,
+    DEDUP_MAX_DISTANCE and DEDUP_MAX_ENTRIES environment variables.
+    """
+    global _simhash_index
+    with _simhash_index_lock:
+        if _simhash_index is None:
+            _simhash_index = SimHashIndex(
+                os.environ.get("DEDUP_INDEX_PATH", SimHashIndex.DEFAULT_PATH),
+                int(
+                    os.environ.get(
+                        "DEDUP_MAX_DISTANCE", SimHashIndex.DEFAULT_MAX_DISTANCE
+                    )
+                ),
+                int(
+                    os.environ.get(
+                        "DEDUP_MAX_ENTRIES", SimHashIndex.DEFAULT_MAX_ENTRIES
+                    )
+                ),
+            )
+        return _simhash_index
@@ -1,9 +1,28 @@
-from typing import List
+import heapq
+import itertools
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+)
 from data.resume import Resume
+from utils.bm25 import BM25Index, get_bm25_index
+from utils.scoring import KeywordQuery
+
+
+FIELD_RANKING = "fields"
+BM25_RANKING = "bm25"
 
 
 def sort_resumes_by_relevance(
-    resumes: List[Resume], keywords: List[str]
+    resumes: List[Resume],
+    keywords: List[str],
+    limit: Optional[int] = None,
+    ranking: str = FIELD_RANKING,
 ) -> List[Resume]:
     """
     Sorts resumes by relevance based on a scoring mechanism.
@@ -11,13 +30,175 @@ def sort_resumes_by_relevance(
     Args:
         resumes (List[Resume]): List of Resume objects.
         keywords (List[str]): List of keywords to match in the skills section.
+        limit (int, optional): Only return the `limit` most relevant resumes,
+            selected without sorting the others. Defaults to None.
+        ranking (str, optional): FIELD_RANKING to score specified attributes and
+            matching skills, or BM25_RANKING to rank by `rank_by_bm25`.
+            Defaults to FIELD_RANKING.
 
     Returns:
         List[Resume]: Sorted list of Resume objects based on relevance score.
     """
+    if ranking == BM25_RANKING:
+        return rank_by_bm25(resumes, keywords, limit)
+    if ranking != FIELD_RANKING:
+        raise ValueError(f"Unknown ranking: {ranking}")
+    return KeywordQuery(keywords).rank(resumes, limit)
+
+
+def rank_by_bm25(
+    resumes: List[Resume],
+    keywords: List[str],
+    limit: Optional[int] = None,
+    index: Optional[BM25Index] = None,
+) -> List[Resume]:
+    """
+    Ranks resumes by the BM25 score of the keywords against their position and
+    skills, weighing rare keywords above common ones. Term statistics come from
+    `index`, to which resumes it does not know yet are added first.
+
+    Args:
+        resumes (List[Resume]): List of Resume objects.
+        keywords (List[str]): The keywords to rank by.
+        limit (int, optional): Only return the `limit` most relevant resumes.
+            Defaults to None.
+        index (BM25Index, optional): The corpus statistics. Defaults to the shared
+            index of all parsed resumes.
+
+    Returns:
+        List[Resume]: The resumes, most relevant first, with `relevance_score` set
+        to their BM25 score.
+    """
+    index = index or get_bm25_index()
+    resumes = list(resumes)
     for resume in resumes:
-        resume.relevance_score = resume.score(keywords)
+        if resume.link not in index:
+            index.add(resume)
+
+    scores = index.scores(keywords)
+    for resume in resumes:
+        resume.relevance_score = round(scores.get(resume.link, 0.0), 2)
+
+    if limit is None or limit >= len(resumes):
+        return sorted(resumes, key=_relevance, reverse=True)
+    return heapq.nlargest(limit, resumes, key=_relevance)
+
+
+def _relevance(resume):
+    return resume.relevance_score
+
+
+class TopK:
+    """
+    Keeps the `k` most relevant resumes seen so far in a min-heap, so a crawl can
+    rank resumes as they arrive instead of collecting and sorting all of them.
+
+    Ties are broken in favour of the resume seen first, matching the stable
+    ordering of `sort_resumes_by_relevance`.
+    """
+
+    def __init__(self, k: int, keywords: Optional[List[str]]):
+        self.k = k
+        self.query = KeywordQuery(keywords)
+        self.keywords = self.query.keywords
+        self._heap = []
+        self._counter = itertools.count()
+
+    def push(self, resume: Resume) -> bool:
+        """
+        Scores the resume and keeps it if it belongs in the current top K.
 
-    sorted_resumes = sorted(resumes, key=lambda x: x.relevance_score, reverse=True)
+        Args:
+            resume (Resume): The resume to consider.
 
-    return sorted_resumes
+        Returns:
+            bool: True if the resume entered the top K.
+        """
+        resume.relevance_score = self.query.score(resume)
+        entry = (resume.relevance_score, -next(self._counter), resume)
+
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+            return True
+        if entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+            return True
+        return False
+
+    @property
+    def threshold(self) -> Optional[int]:
+        """
+        Score of the K-th best resume, or None while fewer than K have been seen.
+        """
+        return self._heap[0][0] if len(self._heap) == self.k else None
+
+    def can_improve(self, upper_bound: int) -> bool:
+        """
+        Checks whether a resume scoring at most `upper_bound` could still enter the top K.
+        """
+        threshold = self.threshold
+        return threshold is None or upper_bound > threshold
+
+    def results(self) -> List[Resume]:
+        """
+        Returns the kept resumes, most relevant first.
+        """
+        return [entry[2] for entry in sorted(self._heap, reverse=True)]
+
+
+class SharedTopK:
+    """
+    Prunes a crawl whose resumes are shared with other searches by the running
+    top K of the search that owns it, for as long as no other search has joined.
+
+    The searches that join rank the resumes by their own keywords, so from then
+    on no card is pruned. The crawl's criteria are the same for every search and
+    are already applied by the sites, so no narrower bound holds for all of them.
+    `pruned` tells whether any card was skipped, i.e. whether the resumes found
+    are complete for other keywords.
+    """
+
+    def __init__(self, top_k: TopK, joined: Callable[[], bool]):
+        self.top_k = top_k
+        self.query = top_k.query
+        self.pruned = False
+        self._joined = joined
+
+    def can_improve(self, upper_bound: int) -> bool:
+        """
+        Checks whether a resume scoring at most `upper_bound` could still enter
+        the top K of the owner, or of any search that joined.
+        """
+        if self._joined() or self.top_k.can_improve(upper_bound):
+            return True
+        self.pruned = True
+        return False
+
+
+def stream_top_k(resumes: Iterable[Resume], top_k: TopK) -> Iterator[List[Resume]]:
+    """
+    Feeds a stream of resumes into `top_k`, yielding the current top K every time
+    it changes, so results can be shown before the stream ends.
+
+    Args:
+        resumes (Iterable[Resume]): The resumes, e.g. from `iter_resumes`.
+        top_k (TopK): The top K to fill; pass the same one to the crawler so it can
+            skip resumes that would not make it.
+
+    Yields:
+        List[Resume]: The current top K, most relevant first.
+    """
+    for resume in resumes:
+        if top_k.push(resume):
+            yield top_k.results()
+
+
+async def astream_top_k(
+    resumes: AsyncIterable[Resume], top_k: TopK
+) -> AsyncIterator[List[Resume]]:
+    """
+    Asynchronous counterpart of `stream_top_k`, e.g. for `aiter_resumes`.
+    """
+    async for resume in resumes:
+        if top_k.push(resume):
+            yield top_k.results()
@@ -0,0 +1,260 @@
+import re
+import sys
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+YEARS_PATTERN = re.compile(r"(\d+)\s*(?:рік|роки|років|years?)")
+MONTHS_PATTERN = re.compile(r"(\d+)\s*(?:місяць|місяці|місяців|months?)")
+NO_EXPERIENCE_PATTERN = re.compile(r"без досвіду|no experience")
+AMOUNT_PATTERN = re.compile(r"\d[\d\s]*")
+THOUSANDS_PATTERN = re.compile(r"(?:k|к|тис)(?!\w)", re.IGNORECASE)
+WORD_PATTERN = re.compile(r"[\w#+.]+")
+
+# Rough exchange rates, only used to compare salaries asked in other currencies.
+UAH_PER_CURRENCY = {
+    "$": 41,
+    "€": 45,
+}
+
+# Canonical IDs of the cities written by either site, in Ukrainian or English.
+CITY_IDS = {
+    "київ": "kyiv",
+    "kyiv": "kyiv",
+    "kiev": "kyiv",
+    "львів": "lviv",
+    "lviv": "lviv",
+    "одеса": "odesa",
+    "odesa": "odesa",
+    "odessa": "odesa",
+    "дніпро": "dnipro",
+    "dnipro": "dnipro",
+    "харків": "kharkiv",
+    "kharkiv": "kharkiv",
+}
+
+CITY_NAMES = {
+    "kyiv": "Київ",
+    "lviv": "Львів",
+    "odesa": "Одеса",
+    "dnipro": "Дніпро",
+    "kharkiv": "Харків",
+}
+
+
+# Spellings of the same skill, by canonical skill ID.
+SKILL_SYNONYMS = {
+    "javascript": ["js", "ecmascript", "java script"],
+    "typescript": ["ts"],
+    "python": ["python3", "py"],
+    "postgresql": ["postgres", "psql", "postgre sql"],
+    "sql server": ["mssql", "ms sql", "ms sql server", "microsoft sql server"],
+    "mongodb": ["mongo"],
+    "go": ["golang"],
+    "kubernetes": ["k8s"],
+    "node.js": ["node", "nodejs", "node js"],
+    "react": ["react.js", "reactjs"],
+    "vue": ["vue.js", "vuejs"],
+    "angular": ["angularjs", "angular.js"],
+    "c#": ["c sharp", "csharp"],
+    "c++": ["cpp"],
+    "html": ["html5"],
+    "css": ["css3"],
+    "rest": ["rest api", "restful", "restful api"],
+    "aws": ["amazon web services"],
+    "google cloud": ["gcp", "google cloud platform"],
+    "machine learning": ["ml", "машинне навчання", "машинное обучение"],
+    "1c": ["1с", "1с:підприємство", "1с:предприятие"],
+    "excel": ["ms excel", "microsoft excel", "ексель", "эксель"],
+    "microsoft office": ["ms office"],
+    "english": ["англійська", "англійська мова", "английский", "английский язык"],
+}
+
+CYRILLIC_PATTERN = re.compile(r"[а-яіїєґё]")
+
+# Inflectional endings of Ukrainian and Russian nouns, adjectives and verbal
+# nouns, longest first.
+WORD_ENDINGS = sorted(
+    set(
+        "ування ювання ання ення іння ість ості ами ями ого ому ему его ими ыми"
+        " ах ях ів ей ой ою ею ом ем ий ій ый ая яя ое ее ые ие ої"
+        " а я и і ї ы у ю о е ь".split()
+    ),
+    key=len,
+    reverse=True,
+)
+MIN_STEM_LENGTH = 3
+
+
+def _is_missing(text: Optional[str]) -> bool:
+    return not text or text.strip() == "Unknown"
+
+
+def parse_position(position: Optional[str]) -> Optional[str]:
+    """
+    Strips a job position, or returns None if it is unknown.
+    """
+    if _is_missing(position):
+        return None
+    return " ".join(position.split())
+
+
+def parse_experience(experience: Optional[str]) -> Optional[int]:
+    """
+    Parses a work experience such as "2 роки 3 місяці" or "2 years, 3 months"
+    into months, or None if it is unknown.
+    """
+    if _is_missing(experience):
+        return None
+
+    experience = experience.lower()
+    years_match = YEARS_PATTERN.search(experience)
+    months_match = MONTHS_PATTERN.search(experience)
+    if not years_match and not months_match:
+        return 0 if NO_EXPERIENCE_PATTERN.search(experience) else None
+
+    months = int(years_match.group(1)) * 12 if years_match else 0
+    return months + (int(months_match.group(1)) if months_match else 0)
+
+
+def format_experience(months: Optional[int]) -> str:
+    if months is None:
+        return "Unknown"
+    return f"{months // 12} years, {months % 12} months"
+
+
+def parse_salary_amount(salary: Optional[str]) -> Tuple[Optional[int], Optional[str]]:
+    """
+    Parses a salary into the amount asked and the sign of its currency, e.g.
+    (1500, "$") for "$1500" and (20000, None) for "20k". The currency is None for
+    salaries in UAH, and both are None if the salary is unknown.
+    """
+    if _is_missing(salary):
+        return None, None
+
+    amount_match = AMOUNT_PATTERN.search(salary)
+    if not amount_match:
+        return None, None
+
+    amount = int(re.sub(r"\s", "", amount_match.group(0)))
+    if THOUSANDS_PATTERN.match(salary, amount_match.end()):
+        amount *= 1000
+    currency = next((sign for sign in UAH_PER_CURRENCY if sign in salary), None)
+    return amount, currency
+
+
+def to_uah(amount: Optional[int], currency: Optional[str] = None) -> Optional[int]:
+    """
+    Converts a salary amount into UAH at the rough rates of UAH_PER_CURRENCY.
+    """
+    if amount is None:
+        return None
+    return amount * UAH_PER_CURRENCY.get(currency, 1)
+
+
+def format_salary(amount: Optional[int], currency: Optional[str] = None) -> str:
+    if amount is None:
+        return "Unknown"
+    if currency:
+        return f"{currency}{amount:,}".replace(",", " ")
+    return f"{amount:,} грн".replace(",", " ")
+
+
+def parse_city(location: Optional[str]) -> Optional[str]:
+    """
+    Returns the canonical ID of a city, or None if it is unknown. Cities without
+    a known ID are identified by their lowercased name.
+    """
+    if _is_missing(location):
+        return None
+    name = " ".join(location.lower().split())
+    return sys.intern(CITY_IDS.get(name, name))
+
+
+def find_city(text: Optional[str]) -> Optional[str]:
+    """
+    Finds a city with a known ID in free text such as a result card, and returns
+    its name as written, or None if the text names none.
+    """
+    return next(
+        (word for word in WORD_PATTERN.findall(text or "") if word.lower() in CITY_IDS),
+        None,
+    )
+
+
+def format_city(city_id: Optional[str]) -> str:
+    if city_id is None:
+        return "Unknown"
+    return CITY_NAMES.get(city_id) or city_id.title()
+
+
+@lru_cache(maxsize=65536)
+def normalize_skill(skill: str) -> str:
+    """
+    Maps a skill or keyword to its canonical skill ID, so skills and keywords
+    compare equal however they were typed: "Postgres" and "PostgreSQL" both
+    become "postgresql", and inflected Ukrainian or Russian words are stemmed.
+    """
+    # Only trailing separators go, so ".NET" keeps its leading dot.
+    name = " ".join(skill.lower().split()).rstrip(".,;:")
+    if name not in SKILL_IDS:
+        name = _stem_words(name)
+    return sys.intern(SKILL_IDS.get(name, name))
+
+
+def _stem_words(name):
+    return " ".join(_stem(word) for word in name.split())
+
+
+def _stem(word):
+    """
+    Strips Ukrainian and Russian inflectional endings from a Cyrillic word until
+    none is left, keeping stems of at least MIN_STEM_LENGTH letters.
+    """
+    if not CYRILLIC_PATTERN.search(word):
+        return word
+
+    stripped = True
+    while stripped:
+        stripped = False
+        for ending in WORD_ENDINGS:
+            if word.endswith(ending) and len(word) - len(ending) >= MIN_STEM_LENGTH:
+                word = word[: -len(ending)]
+                stripped = True
+                break
+    return word
+
+
+def parse_skills(skills: Optional[str]) -> Tuple[str, ...]:
+    """
+    Splits comma-separated skills into sorted, distinct skill IDs.
+    """
+    if _is_missing(skills):
+        return ()
+    return normalize_skills(skills.split(","))
+
+
+def normalize_skills(skills: Iterable[str]) -> Tuple[str, ...]:
+    """
+    Maps skills to sorted, distinct skill IDs. The IDs are interned, since the
+    same few skills appear across most resumes.
+    """
+    return tuple(
+        sorted({skill_id for skill_id in map(normalize_skill, skills) if skill_id})
+    )
+
+
+def text_terms(text: Optional[str]) -> List[str]:
+    """
+    Splits text such as a job position into words normalized like skills, so
+    that "JS developer" and "javascript розробник" share terms.
+    """
+    words = WORD_PATTERN.findall((text or "").lower())
+    return [term for term in map(normalize_skill, words) if term]
+
+
+# Every spelling of a skill, stemmed or not, mapped to its canonical skill ID.
+SKILL_IDS = {}
+for skill_id, synonyms in SKILL_SYNONYMS.items():
+    for synonym in synonyms:
+        SKILL_IDS[synonym] = skill_id
+        SKILL_IDS[_stem_words(synonym)] = skill_id
@@ -0,0 +1,136 @@
+import heapq
+from typing import Iterable, List, Optional
+from data.resume import Resume
+from utils.normalize import normalize_skill
+
+POSITION_POINTS = 2
+EXPERIENCE_POINTS = 2
+SKILLS_POINTS = 2
+LOCATION_POINTS = 1
+SALARY_POINTS = 1
+KEYWORD_POINTS = 5
+
+ATTRIBUTE_POINTS = (
+    POSITION_POINTS
+    + EXPERIENCE_POINTS
+    + SKILLS_POINTS
+    + LOCATION_POINTS
+    + SALARY_POINTS
+)
+
+
+class KeywordQuery:
+    """
+    Scores resumes against a set of keywords. The keywords are normalized into
+    a set of skill tokens once, so scoring a resume is a few attribute checks and
+    one set intersection with its skills.
+
+    Scoring Criteria:
+    - Job position: +2 points if specified.
+    - Experience: +2 points if specified.
+    - Skills: +2 points if specified.
+    - Location: +1 point if specified.
+    - Salary: +1 point if specified.
+    - Skills matching keywords: +5 points for each matching skill.
+    """
+
+    def __init__(self, keywords: Optional[Iterable[str]]):
+        self.keywords = list(keywords or [])
+        self.terms = frozenset(
+            term for term in map(normalize_skill, self.keywords) if term
+        )
+        self.max_score = ATTRIBUTE_POINTS + KEYWORD_POINTS * len(self.terms)
+
+    def score(self, resume: Resume) -> int:
+        """
+        Calculates the relevance score of a resume.
+
+        Args:
+            resume (Resume): The resume to score.
+
+        Returns:
+            int: Total relevance score for the resume.
+        """
+        return self.score_many((resume,))[0]
+
+    def score_many(self, resumes: Iterable[Resume]) -> List[int]:
+        """
+        Calculates the relevance scores of a batch of resumes in one pass.
+
+        Args:
+            resumes (Iterable[Resume]): The resumes to score.
+
+        Returns:
+            List[int]: The scores, in the order of `resumes`.
+        """
+        terms = self.terms
+        scores = []
+        for resume in resumes:
+            score = 0
+            if resume.position is not None:
+                score += POSITION_POINTS
+            if resume.experience_months is not None:
+                score += EXPERIENCE_POINTS
+            if resume.skills:
+                score += SKILLS_POINTS
+                # Skills are distinct and few, so probing the terms one by one is
+                # cheaper than building an intersection set.
+                for skill in resume.skills:
+                    if skill in terms:
+                        score += KEYWORD_POINTS
+            if resume.city_id is not None:
+                score += LOCATION_POINTS
+            if resume.salary_uah is not None:
+                score += SALARY_POINTS
+            scores.append(score)
+        return scores
+
+    def upper_bound(self, resume: Resume) -> int:
+        """
+        Calculates the highest score a resume could reach once it is fully
+        parsed. A partial resume is only bounded by what its result card shows
+        outright: skills listed on the card are all the skills, while any
+        attribute or keyword the card leaves out is assumed to turn out
+        specified or matching. Result cards rarely list skills, so most of them
+        are bounded by `max_score`.
+
+        Args:
+            resume (Resume): The resume, possibly built from a result card.
+
+        Returns:
+            int: Optimistic bound of `score` for this resume.
+        """
+        if not resume.partial:
+            return self.score(resume)
+        if not resume.skills:
+            return self.max_score
+        return ATTRIBUTE_POINTS + KEYWORD_POINTS * len(
+            self.terms.intersection(resume.skills)
+        )
+
+    def rank(
+        self, resumes: Iterable[Resume], limit: Optional[int] = None
+    ) -> List[Resume]:
+        """
+        Scores resumes and returns them most relevant first, keeping the original
+        order of equally relevant resumes. With a `limit`, only the top `limit`
+        resumes are selected, without sorting the rest.
+
+        Args:
+            resumes (Iterable[Resume]): The resumes to rank.
+            limit (int, optional): The number of resumes to return. Defaults to all.
+
+        Returns:
+            List[Resume]: The ranked resumes, with `relevance_score` set.
+        """
+        resumes = list(resumes)
+        for resume, score in zip(resumes, self.score_many(resumes)):
+            resume.relevance_score = score
+
+        if limit is None or limit >= len(resumes):
+            return sorted(resumes, key=_relevance, reverse=True)
+        return heapq.nlargest(limit, resumes, key=_relevance)
+
+
+def _relevance(resume):
+    return resume.relevance_score